@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+""" Headless benchmark for tickbar: frame pacing, tick accuracy, input latency, CPU and memory """
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+def start_xvfb(screen='1920x1080x24'):
+    """ Start Xvfb on a free display and point DISPLAY at it """
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen(['Xvfb', '-displayfd', str(write_fd), '-screen', '0', screen, '-nolisten', 'tcp'],
+                            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        proc.terminate()
+        raise RuntimeError("Xvfb did not report a display number")
+    os.environ['DISPLAY'] = f':{display}'
+    return proc
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return None
+    ordered = sorted(values)
+    result = {f'p{p}': ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
+    result.update(count=len(ordered), min=ordered[0], max=ordered[-1], mean=sum(ordered) / len(ordered))
+    return result
+
+
+def current_rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_kb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if platform.system() == "Darwin" else peak
+    except ImportError:
+        return None
+
+
+class Benchmark:
+    # Seconds of clicking after the first paint before a bar that never starts is reported, not waited on.
+    start_timeout = 10.0
+
+    def __init__(self, args):
+        import tickbar
+        self.tickbar = tickbar
+        self.args = args
+        self.frame_times = []
+        self.frame_costs = []
+        self.boundary_lateness = []
+        self.input_latency = []
+        self.pending_inputs = []
+        self.dispatched_inputs = []
+        self.results = {'python': platform.python_version(), 'platform': platform.platform(),
+                        'renderer': args.renderer, 'countdown': args.countdown,
+                        'animation': args.animation}
+
+        tk = tickbar.load_tk()
+        tickbar.STARTUP.mark('imports')
+        self.root = tk.Tk()
+        tickbar.STARTUP.mark('tk init')
+        self.audio = tickbar.RecordingAudioBackend()
+        self.app = tickbar.HUDApp(self.root, audio_backend=self.audio, fast_start=args.fast_start,
+                                  intro='none' if args.fast_start else 'full', renderer=args.renderer,
+                                  animation=args.animation)
+        if args.countdown:
+            self.app.countdown_var.set(True)
+            self.app.on_countdown_setting()
+        self.instrument()
+
+    def instrument(self):
+        # Instance attributes shadow the methods, and every reschedule looks them up by name.
+        app = self.app
+        animate_progress = app.animate_progress
+        on_boundary = app.on_boundary
+        handle_drag = app.handle_drag
+        handle_resize = app.handle_resize
+
+        def timed_animate_progress():
+            started = time.perf_counter()
+            self.frame_times.append(started)
+            animate_progress()
+            # update_idletasks flushes the redraw the frame queued, so its cost is counted too.
+            self.root.update_idletasks()
+            self.frame_costs.append(time.perf_counter() - started)
+
+        def timed_on_boundary(tick_number, deadline, fired_at):
+            self.boundary_lateness.append(fired_at - deadline)
+            on_boundary(tick_number, deadline, fired_at)
+
+        def timed_input(handler):
+            # Every motion dispatched so far is reflected once the handler has applied the geometry.
+            def wrapper(event):
+                handler(event)
+                now = time.perf_counter()
+                self.input_latency.extend(now - queued for queued in self.dispatched_inputs)
+                self.dispatched_inputs.clear()
+            return wrapper
+
+        def on_dispatch(event):
+            if self.pending_inputs:
+                self.dispatched_inputs.append(self.pending_inputs.pop(0))
+
+        app.animate_progress = timed_animate_progress
+        app.on_boundary = timed_on_boundary
+        app.handle_drag = timed_input(handle_drag)
+        app.handle_resize = timed_input(handle_resize)
+        app.progress.bind('<Expose>', self.on_first_paint, add='+')
+        # Put the dispatch recorder ahead of the app's own <B1-Motion> binding.
+        motion_script = app.progress.bind('<B1-Motion>')
+        app.progress.bind('<B1-Motion>', on_dispatch)
+        app.progress.bind('<B1-Motion>', '+' + motion_script)
+
+    def send(self, sequence, x, y, timed=False):
+        # Queued at the tail, like real input, so presses, motions and releases keep their order.
+        widget = self.app.progress
+        if timed:
+            self.pending_inputs.append(time.perf_counter())
+        widget.event_generate(sequence, x=x, y=y, rootx=widget.winfo_rootx() + x,
+                              rooty=widget.winfo_rooty() + y, when='tail')
+
+    def click(self):
+        w, h = self.app.progress.winfo_width(), self.app.progress.winfo_height()
+        self.send('<Button-1>', w // 2, h // 2)
+        self.send('<ButtonRelease-1>', w // 2, h // 2)
+
+    def on_first_paint(self, event):
+        if 'first_paint_s' in self.results:
+            return
+        self.results['first_paint_s'] = time.perf_counter() - self.tickbar.STARTUP.started
+        self.clicking_since = time.perf_counter()
+        self.click_until_started()
+
+    def click_until_started(self):
+        # A click during the intro only skips it, so click again until one reaches the start/stop handler.
+        startup = self.tickbar.STARTUP
+        if not startup.has('first interactive click'):
+            if time.perf_counter() - self.clicking_since > self.start_timeout:
+                self.results['error'] = f"no click started the timer within {self.start_timeout:g} s"
+                self.results['ok'] = False
+                self.finish()
+                return
+            self.click()
+            self.root.after_idle(self.click_until_started)
+            return
+        started = startup.started
+        marks = dict(startup.marks)
+        self.results['startup_ms'] = {name: (at - started) * 1000 for name, at in startup.marks}
+        # Stamped by toggle_progress itself, when the click is handled and the timer starts.
+        self.results['time_to_interactive_s'] = marks['first interactive click'] - started
+        self.root.after(100, self.measure_running)
+
+    def measure_running(self):
+        self.frame_times.clear()
+        self.frame_costs.clear()
+        self.boundary_lateness.clear()
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+
+        def done():
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            intervals = [(b - a) * 1000 for a, b in zip(self.frame_times, self.frame_times[1:])]
+            self.results['running'] = {
+                'seconds': wall,
+                'cpu_s_per_min': cpu / wall * 60,
+                'frames_per_s': len(self.frame_times) / wall,
+                'frame_interval_ms': percentiles(intervals),
+                'frame_cost_ms': percentiles([v * 1000 for v in self.frame_costs]),
+                'tick_lateness_ms': percentiles([v * 1000 for v in self.boundary_lateness]),
+                'audio_request_latency_ms': percentiles([v * 1000 for v in self.audio.latencies()]),
+            }
+            self.measure_input()
+
+        self.root.after(int(self.args.seconds * 1000), done)
+
+    def measure_input(self):
+        progress = self.app.progress
+        w, h = progress.winfo_width(), progress.winfo_height()
+        steps = self.args.motion_events
+        frames_before = len(self.frame_times)
+        started = time.perf_counter()
+
+        # Drag from the middle, then resize from the right edge, with motion events queued like a fast mouse.
+        self.send('<Button-1>', w // 2, h // 2)
+        for i in range(steps):
+            self.send('<B1-Motion>', w // 2 + 10 + i % 40, h // 2 + i % 20, timed=True)
+        self.send('<ButtonRelease-1>', w // 2, h // 2)
+
+        def resize():
+            edge_x = progress.winfo_width() - 2
+            self.send('<Button-1>', edge_x, h // 2)
+            for i in range(steps):
+                self.send('<B1-Motion>', edge_x + i % 60, h // 2, timed=True)
+            self.send('<ButtonRelease-1>', edge_x, h // 2)
+            self.root.after(200, done)
+
+        def done():
+            wall = time.perf_counter() - started
+            self.results['input'] = {
+                'motion_events': steps * 2,
+                'latency_ms': percentiles([v * 1000 for v in self.input_latency]),
+                'frames_during_input': len(self.frame_times) - frames_before,
+                'seconds': wall,
+            }
+            self.click()
+            self.root.after(100, self.measure_idle)
+
+        self.root.after(100, resize)
+
+    def measure_idle(self):
+        frames_before = len(self.frame_times)
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+
+        def done():
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            self.results['idle'] = {
+                'seconds': wall,
+                'cpu_s_per_min': cpu / wall * 60,
+                'frames': len(self.frame_times) - frames_before,
+            }
+            self.results['rss_kb'] = current_rss_kb()
+            self.results['peak_rss_kb'] = peak_rss_kb()
+            self.finish()
+
+        self.root.after(int(self.args.idle_seconds * 1000), done)
+
+    def finish(self):
+        self.app.host.shutdown()
+
+    def run(self):
+        self.root.mainloop()
+        return self.results
+
+
+def simulate(args):
+    """ Fast-forward a bar on a virtual clock and check its cycle bookkeeping against exact arithmetic """
+    import tickbar
+    root = tickbar.load_tk().Tk()
+    clock = tickbar.VirtualClock()
+    audio = tickbar.RecordingAudioBackend()
+    app = tickbar.HUDApp(root, audio_backend=audio, intro='none', duration=args.duration,
+                         renderer=args.renderer, clock=clock)
+    app.sound_bank.ready.wait(5)
+    if not args.simulate_frames:
+        # A withdrawn bar never gets <Unmap>, so mark it hidden the way the handler would.
+        root.withdraw()
+        app.window_visible = False
+    boundaries = []
+    on_boundary = app.on_boundary
+
+    def recorded_boundary(tick_number, deadline, fired_at):
+        boundaries.append((tick_number, deadline, fired_at))
+        on_boundary(tick_number, deadline, fired_at)
+
+    app.on_boundary = recorded_boundary
+    simulated = args.simulate * 3600
+    wall_start = time.perf_counter()
+    app.start()
+    clock.advance(simulated)
+    app.drain_boundary_events()
+    wall = time.perf_counter() - wall_start
+
+    expected_ticks = int(simulated // args.duration) + 1
+    drift = max((abs(deadline - (app.start_time + tick * args.duration)) for tick, deadline, _ in boundaries), default=0.0)
+    lateness = max((fired_at - deadline for _, deadline, fired_at in boundaries), default=0.0)
+    phase_error = abs((clock.now() - app.start_time) % args.duration - simulated % args.duration)
+    results = {
+        'simulated_s': simulated,
+        'wall_s': wall,
+        'speedup': simulated / wall if wall else None,
+        'duration': args.duration,
+        'ticks': len(boundaries),
+        'expected_ticks': expected_ticks,
+        'last_tick_number': app.last_tick_number,
+        'ticks_in_order': all(tick == i for i, (tick, _, _) in enumerate(boundaries)),
+        'max_drift_s': drift,
+        'max_lateness_s': lateness,
+        'phase_error_s': phase_error,
+        'audio_plays': len(audio.log),
+        'timers_fired': clock.fired,
+    }
+    results['ok'] = (results['ticks'] == expected_ticks and results['last_tick_number'] == expected_ticks - 1
+                     and results['ticks_in_order'] and drift == 0 and lateness == 0 and phase_error < 1e-6
+                     and results['audio_plays'] == expected_ticks)
+    app.host.shutdown()
+    return results
+
+
+def ui_churn(args):
+    """ Open and close the menu and the timer dialog many times and check nothing accumulates """
+    import tickbar
+    root = tickbar.load_tk().Tk()
+    app = tickbar.HUDApp(root, audio_backend=tickbar.RecordingAudioBackend(), intro='none', renderer=args.renderer)
+    root.update()
+
+    def widget_count(widget):
+        return 1 + sum(widget_count(child) for child in widget.winfo_children())
+
+    def cycle():
+        x, y = root.winfo_rootx(), root.winfo_rooty() + root.winfo_height()
+        app.menu_is_open = True
+        app.show_custom_menu(x, y)
+        root.update_idletasks()
+        app.dismiss_menu()
+        if app.menu is not None:
+            app.menu_is_open = True
+            app.menu.post(x, y)
+            app.dismiss_menu()
+        if app.timer_dialog is None:
+            app.timer_dialog = tickbar.CustomDialog(root)
+        root.after_idle(app.timer_dialog.on_cancel)
+        app.timer_dialog.ask('6.0')
+
+    def settle():
+        # Let the menus' delayed resets run, so only what stays behind is counted.
+        deadline = time.perf_counter() + 0.3
+        while time.perf_counter() < deadline:
+            root.update()
+
+    cycle()
+    settle()
+    commands_before = len(root.tk.call('info', 'commands'))
+    widgets_before = widget_count(root)
+    rss_before = current_rss_kb()
+    started = time.perf_counter()
+    for _ in range(args.ui_cycles):
+        cycle()
+    wall = time.perf_counter() - started
+    settle()
+    results = {
+        'cycles': args.ui_cycles,
+        'ms_per_cycle': wall / args.ui_cycles * 1000,
+        'tcl_commands': [commands_before, len(root.tk.call('info', 'commands'))],
+        'widgets': [widgets_before, widget_count(root)],
+        'rss_kb': [rss_before, current_rss_kb()],
+    }
+    results['ok'] = results['tcl_commands'][0] == results['tcl_commands'][1] and \
+        results['widgets'][0] == results['widgets'][1]
+    app.host.shutdown()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run tickbar headless and report performance as JSON.")
+    parser.add_argument('--seconds', type=float, default=10.0, help="length of the running measurement")
+    parser.add_argument('--idle-seconds', type=float, default=5.0, help="length of the stopped measurement")
+    parser.add_argument('--motion-events', type=int, default=200, help="motion events per drag and per resize")
+    parser.add_argument('--fast-start', action='store_true', help="start the bar with --fast-start")
+    parser.add_argument('--renderer', choices=('ttk', 'canvas'), default='ttk', help="bar renderer to measure")
+    parser.add_argument('--animation', choices=('python', 'tcl'), default='python',
+                        help="fill animation to measure; with tcl, frame timings only cover Python-side frames")
+    parser.add_argument('--countdown', action='store_true', help="measure with the countdown overlay shown")
+    parser.add_argument('--simulate', type=float, metavar='HOURS',
+                        help="fast-forward this many hours on a virtual clock and check tick bookkeeping instead")
+    parser.add_argument('--ui-cycles', type=int, metavar='N',
+                        help="open and close the menu and timer dialog N times and check Tcl commands and widgets stay flat")
+    parser.add_argument('--duration', type=float, default=6.0, help="cycle length for --simulate")
+    parser.add_argument('--simulate-frames', action='store_true',
+                        help="keep the bar shown during --simulate so every frame is drawn too")
+    parser.add_argument('--no-xvfb', action='store_true', help="use the current DISPLAY instead of starting Xvfb")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    xvfb = None if args.no_xvfb else start_xvfb()
+    try:
+        if args.simulate:
+            results = simulate(args)
+        elif args.ui_cycles:
+            results = ui_churn(args)
+        else:
+            results = Benchmark(args).run()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+    report = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    if results.get('ok') is False:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
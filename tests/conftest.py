@@ -0,0 +1,68 @@
+import gc
+import tkinter
+
+import pytest
+
+import tickbar
+
+
+class StandInRenderer:
+    """ Records what the bar draws, so tests need a Tcl interpreter but no display """
+    widget = '.'
+
+    def __init__(self):
+        self.values = []
+        self.colors = []
+
+    def set_value(self, value):
+        self.values.append(value)
+
+    def set_color(self, color):
+        self.colors.append(color)
+
+    def prepare_colors(self, colors):
+        pass
+
+    def invalidate(self):
+        pass
+
+
+class HeadlessBar(tickbar.BarCore):
+    """ The shared bar core on a Tcl interpreter, drawing into a StandInRenderer """
+    def __init__(self, root, program, clock=None, sound_bank=None, index='test'):
+        if not isinstance(program, tickbar.IntervalProgram):
+            program = tickbar.IntervalProgram.fixed(program)
+        clock = clock or tickbar.RealClock(root)
+        timing = tickbar.TimingEngine(clock=clock if clock.virtual else None)
+        super().__init__(root, index, clock, tickbar.FrameScheduler(clock), timing, sound_bank, program)
+        self.renderer = StandInRenderer()
+        self.bar_width = 200
+
+    def check_color(self, color):
+        # A Tcl interpreter has no winfo; the stand-in renderer takes any colour.
+        pass
+
+
+@pytest.fixture
+def root():
+    tickbar.load_tk()
+    yield tkinter.Tcl()
+    # Bars hold their interpreter in reference cycles; free it here, as Tcl aborts if another
+    # thread's garbage collection deletes it.
+    gc.collect()
+
+
+@pytest.fixture
+def make_bar(root):
+    """ make_bar(program or duration, **HeadlessBar options); every bar is closed after the test """
+    bars = []
+
+    def make(program, **options):
+        bar = HeadlessBar(root, program, **options)
+        bars.append(bar)
+        return bar
+
+    yield make
+    for bar in bars:
+        bar.close()
+        bar.timing.shutdown()
@@ -0,0 +1,90 @@
+import pytest
+
+import tickbar
+
+
+def hidden_tcl_bar(make_bar, program):
+    """ The Tcl frame proc on a bar that isn't shown, so it only tracks segments and never draws """
+    bar = make_bar(program)
+    bar.window_visible = False
+    bar.tcl_animation = tickbar.TclAnimation(bar)
+    return bar
+
+
+@pytest.fixture
+def root(root):
+    # Tcl's clock, with a wall-clock step we can set from the test.
+    root.tk.eval('''
+        set ::step 0
+        rename ::clock ::real_clock
+        proc ::clock {args} {
+            if {$args eq "microseconds"} {
+                return [expr {[::real_clock microseconds] + $::step}]
+            }
+            ::real_clock {*}$args
+        }
+    ''')
+    return root
+
+
+def step_wall_clock(root, bar, seconds):
+    root.tk.eval(f'set ::step {int(seconds * 1e6)}')
+    root.tk.call('::tickbar::stop', bar.index)
+    root.tk.call('::tickbar::frame', bar.index)
+
+
+def test_wall_clock_step_is_undone_at_the_next_segment_callback(root, make_bar):
+    program = tickbar.IntervalProgram([{'duration': 5.0, 'color': '#111111'}, {'duration': 5.0, 'color': '#222222'}])
+    bar = hidden_tcl_bar(make_bar, program)
+    bar.start()
+    assert bar.segment_index == 0
+    var = bar.tcl_animation.var
+    # Tcl now believes the second segment has begun; Python's clock says it hasn't.
+    step_wall_clock(root, bar, 6.0)
+    assert bar.segment_index == 0
+    assert bar.renderer.colors == ['#111111']
+    assert float(root.tk.call('set', f'{var}(start)')) == pytest.approx(bar.tcl_animation.tcl_start(), abs=0.01)
+    root.tk.call('::tickbar::stop', bar.index)
+    root.tk.call('::tickbar::frame', bar.index)
+    assert int(root.tk.call('set', f'{var}(tick)')) == 0
+
+
+def test_early_end_of_a_one_shot_program_is_ignored(root, make_bar):
+    bar = hidden_tcl_bar(make_bar, tickbar.IntervalProgram([{'duration': 5.0}], repeat=False))
+    bar.start()
+    step_wall_clock(root, bar, 6.0)
+    assert bar.is_running
+    assert root.tk.call('set', f'{bar.tcl_animation.var}(after)') != ''
+
+
+@pytest.mark.parametrize('into, delay_ms', [
+    # 32 s over 256 px: a pixel every 125 ms, the next one due from wherever the frame landed.
+    (0.0, 125), (0.0625, 63), (1.0, 125), (31.875, 125),
+    # The last pixel step ends on the boundary; a frame is never due sooner than update_interval.
+    (31.96875, 32), (32 - 1 / 512, 8),
+])
+def test_next_frame_delay_waits_for_the_next_pixel(make_bar, into, delay_ms):
+    bar = make_bar(32.0)
+    bar.bar_width = 256
+    assert bar.next_frame_delay(into, 32.0) == delay_ms
+
+
+def test_next_frame_delay_of_a_zero_width_bar_waits_for_the_boundary(make_bar):
+    bar = make_bar(2.0)
+    bar.bar_width = 0
+    assert bar.next_frame_delay(0.5, 2.0) == 1500
+
+
+def test_next_frame_delay_when_hidden_or_counting_down(make_bar):
+    bar = make_bar(32.0)
+    bar.bar_width = 1
+    bar.window_visible = False
+    # Hidden: an idle poll, clamped to the boundary.
+    assert (bar.next_frame_delay(1.0, 32.0), bar.next_frame_delay(31.75, 32.0)) == (500, 250)
+    bar.window_visible = True
+    bar.countdown = object()
+    try:
+        # The countdown's whole seconds change 0.25 s from now, long before the one-pixel bar moves.
+        assert bar.next_frame_delay(1.75, 32.0) == 250
+    finally:
+        bar.countdown = None
@@ -0,0 +1,98 @@
+import wave
+from array import array
+
+import pytest
+
+import tickbar
+
+
+class DevicelessStream(tickbar.StreamingAudioBackend):
+    """ The streaming mixer with no audio device; tests call render() themselves """
+    def open(self):
+        pass
+
+    def decode(self, path):
+        return array('h', [1000] * 5)
+
+
+def test_unknown_backend_name_plays_nothing(monkeypatch, capsys):
+    monkeypatch.setenv('TICKBAR_AUDIO', 'strem')
+    assert type(tickbar.env_audio_backend()) is tickbar.NullAudioBackend
+    assert "unknown TICKBAR_AUDIO 'strem'" in capsys.readouterr().out
+    monkeypatch.setenv('TICKBAR_AUDIO', 'recording')
+    assert type(tickbar.env_audio_backend()) is tickbar.RecordingAudioBackend
+    with pytest.raises(TypeError):
+        tickbar.AudioBackend()
+
+
+def test_gap_is_measured_against_the_fired_boundary():
+    backend = DevicelessStream(rate=1000, channels=1)
+    backend.stream_epoch = 100.0
+    backend.schedule_ticks('bar', backend.decode('tick'), 100.0, 0.05, 0)
+    # Boundary 0 is drawn 2 ms before its tick is heard; boundary 2 fires before the stream reaches it.
+    backend.note_boundary('bar', 0, 99.998)
+    backend.note_boundary('bar', 2, 100.103)
+    backend.render(0, 100)
+    backend.note_boundary('bar', 1, 100.05)
+    backend.render(100, 100)
+    assert list(backend.gaps) == pytest.approx([0.002, 0.0, -0.003])
+    assert backend.heard == {('bar', 3): pytest.approx(100.15)}
+    backend.clear_ticks('bar')
+    assert backend.heard == {} and backend.fired == {}
+
+
+def test_sound_switched_on_mid_cycle_waits_for_the_next_boundary(make_bar):
+    backend = DevicelessStream()
+    bank = tickbar.SoundBank(backend)
+    bank.load({'tick': 'tick.wav'})
+    bar = make_bar(1.0, sound_bank=bank)
+    bar.start(bar.clock.now() - 2.5)
+    # A (re)started cycle streams the boundary in progress, as the timing engine fires it.
+    assert backend.schedules[bar][3] == 2
+    bar.sound_enabled = False
+    bar.update_tick_schedule()
+    assert bar not in backend.schedules
+    bar.sound_enabled = True
+    bar.update_tick_schedule()
+    assert backend.schedules[bar][3] == 3
+
+
+def write_wav(path, width, frames, rate=8000, channels=1):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return path
+
+
+WIDE = [0x12345678, -0x7FFF0000, 0x00010000, -1]
+
+
+@pytest.mark.parametrize('width, frames, expected', [
+    (1, bytes([128, 255, 0]), [0, 127 << 8, -128 << 8]),
+    (2, array('h', [1, -2, 0x1234]).tobytes(), [1, -2, 0x1234]),
+    (4, array('i', WIDE).tobytes(), [v >> 16 for v in WIDE]),
+])
+def test_decode_wav_sample_widths(tmp_path, width, frames, expected):
+    path = write_wav(str(tmp_path / 'tick.wav'), width, frames)
+    assert list(tickbar.decode_wav(path, 8000, 1)) == expected
+
+
+@pytest.mark.parametrize('typecode, values, expected', [
+    ('h', [1, -2, 0x1234], [1, -2, 0x1234]),
+    ('i', WIDE, [v >> 16 for v in WIDE]),
+])
+def test_decode_wav_on_a_big_endian_host(monkeypatch, tmp_path, typecode, values, expected):
+    # On a big-endian host wave swaps each little-endian word into host order; with the words
+    # reversed in the file, this host sees the same thing.
+    words = array(typecode, values)
+    words.byteswap()
+    path = write_wav(str(tmp_path / 'tick.wav'), words.itemsize, words.tobytes())
+    monkeypatch.setattr(tickbar.sys, 'byteorder', 'big')
+    assert list(tickbar.decode_wav(path, 8000, 1)) == expected
+
+
+def test_decode_wav_resamples_and_spreads_channels(tmp_path):
+    path = write_wav(str(tmp_path / 'tick.wav'), 2, array('h', [10, 20, 30, 40]).tobytes(), rate=4000)
+    assert list(tickbar.decode_wav(path, 8000, 2)) == [10, 10, 10, 10, 20, 20, 20, 20, 30, 30, 30, 30, 40, 40, 40, 40]
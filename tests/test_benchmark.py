@@ -0,0 +1,62 @@
+import time
+from types import SimpleNamespace
+
+import benchmark
+import tickbar
+
+
+class StandInRoot:
+    def __init__(self):
+        self.idle = []
+        self.later = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def after(self, delay_ms, callback):
+        self.later.append((delay_ms, callback))
+
+
+class ClickLoop(benchmark.Benchmark):
+    """ Just the startup click loop, with a bar that starts on the given click or never """
+    def __init__(self, starts_on_click=None):
+        self.tickbar = SimpleNamespace(STARTUP=tickbar.StartupProfile(started=time.perf_counter()))
+        self.root = StandInRoot()
+        self.results = {}
+        self.starts_on_click = starts_on_click
+        self.clicks = 0
+        self.finished = False
+
+    def click(self):
+        self.clicks += 1
+        if self.clicks == self.starts_on_click:
+            self.tickbar.STARTUP.mark('first interactive click')
+
+    def finish(self):
+        self.finished = True
+
+    def run(self):
+        self.on_first_paint(None)
+        while self.root.idle:
+            self.root.idle.pop(0)()
+        return self.results
+
+
+def test_clicks_until_the_timer_starts():
+    loop = ClickLoop(starts_on_click=3)
+    results = loop.run()
+    assert loop.clicks == 3
+    assert results['time_to_interactive_s'] >= results['first_paint_s']
+    assert 'first interactive click' in results['startup_ms']
+    assert [delay for delay, _ in loop.root.later] == [100]
+    assert 'error' not in results and not loop.finished
+
+
+def test_gives_up_on_a_bar_that_never_starts():
+    loop = ClickLoop()
+    loop.start_timeout = 0.05
+    results = loop.run()
+    assert results['ok'] is False
+    assert results['error'] == "no click started the timer within 0.05 s"
+    assert loop.finished and loop.clicks > 0
+    assert 'time_to_interactive_s' not in results and loop.root.later == []
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+import _tkinter
+
+import pytest
+
+import tickbar
+
+
+def run(root, bridge, coroutine):
+    """ Run the coroutine on an asyncio loop in its own thread while this thread runs the Tcl loop """
+    loop = bridge.loop
+    outcome = {}
+    done = threading.Event()
+
+    def runner():
+        try:
+            outcome['result'] = loop.run_until_complete(coroutine)
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            done.set()
+            # Wake the Tcl loop so it notices we're done.
+            bridge.call_soon(lambda: None)
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    give_up = time.perf_counter() + 10
+    while not done.is_set():
+        assert time.perf_counter() < give_up, "coroutine did not finish"
+        root.tk.dooneevent(_tkinter.ALL_EVENTS)
+    thread.join()
+    loop.close()
+    bridge.close()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+def test_call_runs_on_the_tk_thread(root):
+    bridge = tickbar.AsyncBridge(root, asyncio.new_event_loop())
+    tk_thread = threading.get_ident()
+
+    async def main():
+        where = await bridge.call(threading.get_ident)
+        total = await bridge.call(sum, [1, 2, 3])
+        return where, total
+
+    assert run(root, bridge, main()) == (tk_thread, 6)
+
+
+def test_errors_reach_the_awaiting_coroutine(root):
+    bridge = tickbar.AsyncBridge(root, asyncio.new_event_loop())
+
+    async def main():
+        with pytest.raises(ZeroDivisionError):
+            await bridge.call(lambda: 1 / 0)
+        return await bridge.call(lambda: 'still working')
+
+    assert run(root, bridge, main()) == 'still working'
+
+
+def test_tick_bar_controls_state_and_events(root, make_bar):
+    bridge = tickbar.AsyncBridge(root, asyncio.new_event_loop())
+    bar = make_bar(0.2)
+
+    async def main():
+        tick_bar = tickbar.AsyncTickBar(bar, bridge)
+        assert tick_bar.state['running'] is False
+        events = tick_bar.events()
+        await tick_bar.start()
+        received = [await events.__anext__() for _ in range(3)]
+        await events.aclose()
+        state = tick_bar.state
+        await tick_bar.set_duration(5.0)
+        duration = tick_bar.state['duration']
+        await tick_bar.stop()
+        stopped = tick_bar.state
+        await tick_bar.close()
+        return received, state, duration, stopped
+
+    received, state, duration, stopped = run(root, bridge, main())
+    ticks = [event['tick'] for event in received]
+    assert ticks == list(range(ticks[0], ticks[0] + 3))
+    assert [event['deadline'] - received[0]['deadline'] for event in received] == pytest.approx([0, 0.2, 0.4])
+    assert all(event['late'] < 0.05 for event in received)
+    assert state['running'] is True and state['duration'] == 0.2
+    assert duration == 5.0
+    assert stopped['running'] is False
+    assert bar.renderer.values, "the frame loop never drew"
+    assert bar.boundary_listeners == []
+
+
+def test_listener_removal_while_ticking(make_bar):
+    bar = make_bar(0.1)
+    calls = []
+    listeners = [lambda *args, n=n: calls.append(n) for n in range(50)]
+    for listener in listeners:
+        bar.add_boundary_listener(listener)
+    bar.timing.start_timer(bar, time.perf_counter(), tickbar.IntervalProgram.fixed(0.1), bar.on_boundary)
+    # Removal from another thread swaps the list, so a boundary in progress finishes on the old one.
+    for listener in listeners:
+        bar.remove_boundary_listener(listener)
+        time.sleep(0.004)
+    assert bar.boundary_listeners == []
+    bar.timing.shutdown()
+    assert calls
@@ -0,0 +1,45 @@
+import pytest
+
+import tickbar
+
+
+@pytest.fixture(autouse=True)
+def default_audio(monkeypatch):
+    monkeypatch.delenv('TICKBAR_AUDIO', raising=False)
+
+
+def test_bars_and_durations_in_range():
+    args = tickbar.parse_args(['--bars', '2', '--durations', '1', '10'])
+    assert args.bars == 2 and args.durations == [1.0, 10.0]
+
+
+@pytest.mark.parametrize('argv', [['--bars', '0'], ['--bars', '-1'], ['--durations', '6', '0.5'],
+                                  ['--durations', '11'], ['--durations', 'nan']])
+def test_out_of_range_is_rejected(argv, capsys):
+    with pytest.raises(SystemExit) as raised:
+        tickbar.parse_args(argv)
+    assert raised.value.code == 2
+    assert argv[0] in capsys.readouterr().err
+
+
+def test_streaming_allows_sub_second_durations(monkeypatch):
+    monkeypatch.setenv('TICKBAR_AUDIO', 'stream')
+    args = tickbar.parse_args(['--durations', '0.25'])
+    assert args.durations == [0.25]
+    # The bars are handed the backend the range was checked against.
+    assert type(args.audio_backend) is tickbar.StreamingAudioBackend
+    with pytest.raises(SystemExit):
+        tickbar.parse_args(['--durations', '0.05'])
+
+
+def test_an_unknown_backend_gets_the_one_second_floor(monkeypatch, capsys):
+    monkeypatch.setenv('TICKBAR_AUDIO', 'strem')
+    with pytest.raises(SystemExit):
+        tickbar.parse_args(['--durations', '0.25'])
+    assert "1 and 10 seconds" in capsys.readouterr().err
+
+
+def test_terminal_mode_takes_any_duration():
+    args = tickbar.parse_args(['--tty', '--durations', '30'])
+    assert args.durations == [30.0] and args.audio_backend is None
+    assert tickbar.parse_args(['--tty', '--durations', '0.5']).durations == [0.5]
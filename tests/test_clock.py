@@ -0,0 +1,97 @@
+import pytest
+
+import tickbar
+
+
+def test_timers_fire_in_deadline_order_at_their_deadlines():
+    clock = tickbar.VirtualClock(start=10.0)
+    fired = []
+
+    def record(name):
+        return lambda: fired.append((name, clock.now()))
+
+    clock.call_at(10.3, record('c'))
+    clock.after(100, record('a'))
+    clock.call_at(10.2, record('b'))
+    # Same deadline: first scheduled, first fired.
+    clock.call_at(10.2, record('b2'))
+    clock.advance(0.25)
+    assert fired == [('a', 10.1), ('b', 10.2), ('b2', 10.2)]
+    assert clock.now() == 10.25
+    clock.advance(1.0)
+    assert fired[-1] == ('c', 10.3)
+    assert clock.now() == 11.25
+    assert clock.fired == 4
+
+
+def test_cancelled_and_past_timers():
+    clock = tickbar.VirtualClock()
+    fired = []
+    cancelled = clock.after(50, lambda: fired.append('cancelled'))
+    clock.after(100, lambda: fired.append('kept'))
+    clock.after_cancel(cancelled)
+    clock.advance(0.2)
+    # A deadline already behind the clock runs at the current time on the next advance.
+    clock.call_at(0.1, lambda: fired.append(clock.now()))
+    clock.advance(0)
+    assert fired == ['kept', 0.2]
+    assert clock.fired == 2
+
+
+def test_timers_scheduled_by_a_timer_run_in_the_same_advance():
+    clock = tickbar.VirtualClock()
+    fired = []
+
+    def chain():
+        fired.append(clock.now())
+        if len(fired) < 5:
+            clock.after(100, chain)
+
+    clock.after(100, chain)
+    clock.advance(0.45)
+    assert fired == pytest.approx([0.1, 0.2, 0.3, 0.4])
+    clock.advance(1.0)
+    assert len(fired) == 5
+
+
+def test_virtual_timing_engine_fires_boundaries_exactly_on_their_deadlines():
+    clock = tickbar.VirtualClock(start=50.0)
+    engine = tickbar.TimingEngine(clock=clock)
+    program = tickbar.IntervalProgram([{'duration': 0.5}, {'duration': 1.5}])
+    fired = []
+    engine.start_timer('bar', 50.0, program, lambda *boundary: fired.append(boundary))
+    assert fired == []
+    clock.advance(0)
+    assert fired == [(0, 50.0, 50.0)]
+    clock.advance(10.0)
+    deadlines = [50.0 + program.boundary_offset(tick) for tick in range(11)]
+    assert fired == [(tick, deadline, deadline) for tick, deadline in enumerate(deadlines)]
+    assert engine.thread is None
+
+
+def test_virtual_timing_engine_interleaves_timers_and_stops_cleanly():
+    clock = tickbar.VirtualClock()
+    engine = tickbar.TimingEngine(clock=clock)
+    fired = []
+    engine.start_timer('slow', 0.0, tickbar.IntervalProgram.fixed(3.0), lambda t, d, f: fired.append(('slow', d)))
+    engine.start_timer('fast', 0.0, tickbar.IntervalProgram.fixed(2.0), lambda t, d, f: fired.append(('fast', d)))
+    clock.advance(6.5)
+    assert fired == [('slow', 0.0), ('fast', 0.0), ('fast', 2.0), ('slow', 3.0), ('fast', 4.0),
+                     ('slow', 6.0), ('fast', 6.0)]
+    engine.stop_timer('fast')
+    clock.advance(3.0)
+    assert fired[-1] == ('slow', 9.0)
+    engine.shutdown()
+    clock.advance(10.0)
+    assert fired[-1] == ('slow', 9.0)
+
+
+def test_virtual_one_shot_program_stops_after_its_last_boundary():
+    clock = tickbar.VirtualClock()
+    engine = tickbar.TimingEngine(clock=clock)
+    fired = []
+    program = tickbar.IntervalProgram([{'duration': 1.0}, {'duration': 2.0}], repeat=False)
+    engine.start_timer('bar', 0.0, program, lambda t, d, f: fired.append((t, d)))
+    clock.advance(20.0)
+    assert fired == [(0, 0.0), (1, 1.0)]
+    assert engine.virtual_timer is None
@@ -0,0 +1,184 @@
+import os
+import socket
+import tempfile
+import time
+import tkinter
+import _tkinter
+
+import pytest
+
+import tickbar
+
+
+class StandInBar:
+    """ Just enough of HUDApp for the control protocol, ticking on a real timing engine """
+    def __init__(self, host, index, duration):
+        self.host = host
+        self.index = index
+        self.clock = tickbar.RealClock(None)
+        self.program = tickbar.IntervalProgram.fixed(duration)
+        self.progress_duration = duration
+        self.is_running = False
+        self.start_time = None
+        self.last_tick_number = -1
+
+    def start(self):
+        if not self.is_running:
+            self.is_running = True
+            self.start_time = self.clock.now()
+            self.host.timing.start_timer(self, self.start_time, self.program, self.on_boundary)
+
+    def stop(self):
+        self.is_running = False
+        self.host.timing.stop_timer(self)
+
+    def on_boundary(self, tick_number, deadline, fired_at):
+        self.last_tick_number = tick_number
+        for listener in self.host.boundary_listeners:
+            listener(self, tick_number, deadline, fired_at)
+
+
+class StandInHost:
+    def __init__(self):
+        self.root = tkinter.Tcl()
+        self.timing = tickbar.TimingEngine()
+        self.boundary_listeners = []
+        self.bars = [StandInBar(self, 0, 0.2)]
+
+
+@pytest.fixture
+def server():
+    host = StandInHost()
+    path = os.path.join(tempfile.mkdtemp(), 'tickbar.sock')
+    server = tickbar.ControlServer(host, path)
+    yield server
+    host.timing.shutdown()
+    server.close()
+
+
+class Client:
+    def __init__(self, server):
+        self.server = server
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(server.path)
+        self.sock.setblocking(False)
+        self.buffer = b''
+        self.ticks = []
+
+    def readline(self, timeout=2.0):
+        # The server runs on the Tcl event loop, so pump it while waiting for a line.
+        give_up = time.perf_counter() + timeout
+        while b'\n' not in self.buffer:
+            assert time.perf_counter() < give_up, "no reply from the control server"
+            self.server.tk.dooneevent(_tkinter.DONT_WAIT)
+            try:
+                self.buffer += self.sock.recv(4096)
+            except BlockingIOError:
+                time.sleep(0.001)
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return line.decode()
+
+    def request(self, line):
+        # Boundary lines may arrive ahead of the reply; they are set aside in order.
+        self.sock.sendall(line.encode() + b'\n')
+        while True:
+            reply = self.readline()
+            if not reply.startswith('tick '):
+                return reply
+            self.ticks.append(reply.split())
+
+    def next_tick(self):
+        if self.ticks:
+            return self.ticks.pop(0)
+        return self.readline().split()
+
+    def close(self):
+        self.sock.close()
+
+
+def test_start_stop_status_and_boundaries(server):
+    client = Client(server)
+    assert client.request('ping') == 'ok pong'
+    assert client.request('status').startswith('ok 0,stopped,0.2,')
+    assert client.request('subscribe') == 'ok'
+    assert client.request('start') == 'ok'
+    ticks = [client.next_tick() for _ in range(3)]
+    assert [words[:3] for words in ticks] == [['tick', '0', '0'], ['tick', '0', '1'], ['tick', '0', '2']]
+    start_time = server.host.bars[0].start_time
+    assert [float(words[3]) - start_time for words in ticks] == pytest.approx([0.0, 0.2, 0.4], abs=1e-6)
+    assert client.request('status').startswith('ok 0,running,0.2,')
+    assert client.request('stop') == 'ok'
+    assert client.request('status').startswith('ok 0,stopped,0.2,')
+    assert client.request('bogus') == 'err unknown command: bogus'
+    assert client.request('@5 start') == 'err no such bar @5'
+    client.close()
+
+
+def test_live_socket_is_not_taken_over(server):
+    with pytest.raises(OSError):
+        tickbar.ControlServer(server.host, server.path)
+    assert Client(server).request('ping') == 'ok pong'
+
+
+def test_stale_socket_is_replaced():
+    path = os.path.join(tempfile.mkdtemp(), 'tickbar.sock')
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    host = StandInHost()
+    server = tickbar.ControlServer(host, path)
+    try:
+        assert Client(server).request('ping') == 'ok pong'
+    finally:
+        server.close()
+
+
+def test_partial_writes_are_buffered_in_order(server):
+    client = Client(server)
+    assert client.request('ping') == 'ok pong'
+    [peer] = server.clients
+    peer.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    lines = [f"line {n} " + 'x' * 2000 for n in range(20)]
+    for line in lines:
+        assert server.send(peer, line)
+    assert server.outgoing[peer]
+    assert [client.readline() for _ in lines] == lines
+    assert client.request('ping') == 'ok pong'
+    assert not server.outgoing[peer]
+
+
+class BarCoreHost:
+    """ A host whose bars are real BarCores; bar 1 has been closed, so list position and index differ """
+    def __init__(self, root, make_bar):
+        self.root = root
+        self.boundary_listeners = []
+        self.bars = [make_bar(4.0, index=0), make_bar(8.0, index=2)]
+
+
+def test_bars_are_addressed_by_index_on_a_real_bar_core(root, make_bar):
+    host = BarCoreHost(root, make_bar)
+    listeners = host.boundary_listeners
+    server = tickbar.ControlServer(host, os.path.join(tempfile.mkdtemp(), 'tickbar.sock'))
+    # The listener list the timing thread may be walking is replaced, not appended to.
+    assert listeners == [] and host.boundary_listeners == [server.publish_boundary]
+    first, last = host.bars
+    client = Client(server)
+    try:
+        assert client.request('@2 start') == 'ok'
+        assert last.is_running and not first.is_running
+        assert client.request('status').split()[1:2] == ['0,stopped,4,0.0000,-1']
+        assert client.request('@2 status').split()[1].startswith('2,running,8,')
+        for missing in ('@1', '@-1', '@-2', '@x', '@'):
+            assert client.request(f'{missing} stop') == f'err no such bar {missing}'
+        assert last.is_running
+        assert client.request('@0 toggle') == 'ok'
+        assert first.is_running
+        assert client.request('toggle') == 'ok'
+        assert not first.is_running and not last.is_running
+        assert client.request('@2 duration 3') == 'ok'
+        assert (first.progress_duration, last.progress_duration) == (4.0, 3.0)
+        assert client.request('duration 0.5') == 'err duration out of range: 0.5'
+    finally:
+        client.close()
+        server.close()
+    assert host.boundary_listeners == []
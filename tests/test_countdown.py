@@ -0,0 +1,112 @@
+import pytest
+
+import tickbar
+
+
+@pytest.mark.parametrize('seconds, cycle, text', [
+    (0, 0, '0s #1'),
+    (9.7, 0, '9s #1'),
+    (59, 4, '59s #5'),
+    (60, 9, '1:00 #10'),
+    (125, 98, '2:05 #99'),
+    (600, 999, '10:00 #1000'),
+])
+def test_format_countdown(seconds, cycle, text):
+    assert tickbar.format_countdown(seconds, cycle) == text
+
+
+class StandInFont:
+    """ Measures text as 6 pixels a character """
+    def __init__(self, **options):
+        self.options = options
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    def measure(self, text):
+        return 6 * len(text)
+
+
+class StandInCanvas:
+    """ Records text writes and placements instead of drawing them """
+    def __init__(self, master=None, **options):
+        self.texts = []
+        self.placed = None
+
+    def bind(self, sequence, handler):
+        pass
+
+    def create_text(self, x, y, **options):
+        return 1
+
+    def coords(self, item, x, y):
+        pass
+
+    def itemconfigure(self, item, text):
+        self.texts.append(text)
+
+    def place(self, **geometry):
+        self.placed = geometry
+
+    def destroy(self):
+        pass
+
+
+class StandInProgress:
+    def winfo_width(self):
+        return 300
+
+    def winfo_height(self):
+        return 20
+
+
+@pytest.fixture
+def overlay(monkeypatch, make_bar):
+    monkeypatch.setattr(tickbar.tkfont, 'Font', StandInFont)
+    monkeypatch.setattr(tickbar.tk, 'Canvas', StandInCanvas)
+
+    def make(program):
+        bar = make_bar(program)
+        bar.progress = StandInProgress()
+        for handler in ('start_potential_action', 'toggle_progress', 'on_motion', 'show_menu', 'update_cursor'):
+            setattr(bar, handler, None)
+        bar.set_countdown(True)
+        return bar.countdown
+
+    return make
+
+
+def test_badge_fits_the_longest_segment_of_the_program(overlay):
+    countdown = overlay(5.0)
+    assert countdown.widest == '5s #100'
+    assert countdown.canvas.placed['width'] == 6 * len('5s #100') + 8
+    program = tickbar.IntervalProgram([{'duration': 30.0}, {'duration': 754.5}])
+    countdown.bar.set_program(program)
+    # Loading a program lays the badge out again for its own widest text.
+    assert countdown.widest == '12:35 #100'
+    assert countdown.canvas.placed['width'] == 6 * len('12:35 #100') + 8
+    countdown.bar.set_program(tickbar.IntervalProgram([{'duration': 2.0}, {'duration': 1.0}], repeat=False))
+    assert countdown.widest == '2s #1'
+
+
+def test_text_is_rewritten_only_when_it_changes(overlay):
+    countdown = overlay(5.0)
+    for seconds_left in (4.9, 4.5, 4.01, 3.99, 3.0):
+        countdown.update(seconds_left, 0)
+    assert countdown.canvas.texts == ['5s #1', '4s #1', '3s #1']
+    countdown.invalidate()
+    countdown.update(3.0, 0)
+    countdown.clear()
+    countdown.clear()
+    assert countdown.canvas.texts[3:] == ['3s #1', '']
+
+
+def test_badge_widens_when_the_cycle_count_gains_a_digit(overlay):
+    countdown = overlay(5.0)
+    width = countdown.canvas.placed['width']
+    countdown.update(5.0, 98)
+    assert countdown.canvas.placed['width'] == width
+    countdown.update(5.0, 100)
+    assert countdown.widest == '5s #1000'
+    assert countdown.canvas.placed['width'] == width + 6
+    assert countdown.canvas.texts[-1] == '5s #101'
@@ -0,0 +1,42 @@
+import pytest
+
+import tickbar
+
+
+@pytest.fixture
+def keyframes():
+    return tickbar.build_intro_keyframes(226, 26, 100, 50)
+
+
+def test_one_keyframe_per_step_starting_on_the_bar(keyframes):
+    assert len(keyframes) == 240
+    assert keyframes[0][0] == (226, 26, 100, 50)
+    assert all(0 <= color_index < len(tickbar.INTRO_COLORS) for _, color_index, _, _ in keyframes)
+    assert all(0 <= value <= 100 for _, _, value, _ in keyframes)
+
+
+def test_bar_grows_about_its_centre_holds_then_shrinks_back(keyframes):
+    widths = [geometry[0] for geometry, *_ in keyframes]
+    assert widths[:30] == sorted(widths[:30])
+    assert widths[180:] == sorted(widths[180:], reverse=True)
+    held = {geometry for geometry, *_ in keyframes[29:181]}
+    assert len(held) == 1
+    width, height, x, y = held.pop()
+    assert (width, height) == (338, 38)
+    assert abs((x + width / 2) - (100 + 226 / 2)) <= 1
+    assert abs((y + height / 2) - (50 + 26 / 2)) <= 1
+    assert keyframes[-1][0] == pytest.approx((226, 26, 100, 50), abs=3)
+
+
+def test_text_is_revealed_after_the_bar_fills(keyframes):
+    reveal = len(keyframes) - 79
+    # The reveal frame snaps to a full bar in the final colour; the fill stays full from there.
+    assert keyframes[reveal][1:3] == (len(tickbar.INTRO_COLORS) - 1, 100)
+    assert all(value == 100 for _, _, value, _ in keyframes[reveal:])
+    texts = [text for *_, text in keyframes]
+    assert set(texts[:reveal + 7]) == {''}
+    assert texts[reveal + 7:reveal + 15] == ['T'] * 8
+    assert texts[reveal + 15] == 'T I'
+    assert texts[-1] == 'T I C K B A R'
+    # Each new frame of text only ever adds characters.
+    assert all(later.startswith(earlier) for earlier, later in zip(texts, texts[1:]))
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+import tickbar
+
+
+class StandInRoot:
+    """ Records geometry requests instead of moving a window """
+    def __init__(self):
+        self.geometries = []
+
+    def geometry(self, spec):
+        self.geometries.append(spec)
+
+
+@pytest.fixture
+def app():
+    # Only the pointer state HUDApp.__init__ sets up; the window itself is the stand-in root.
+    app = tickbar.HUDApp.__new__(tickbar.HUDApp)
+    app.root = StandInRoot()
+    app.clock = tickbar.VirtualClock(start=1.0)
+    app.scheduler = tickbar.FrameScheduler(app.clock)
+    app.stats = None
+    app.menu_is_open = app.menu_was_open_on_click = app.pointer_held = False
+    app.is_dragging = app.is_resizing = False
+    app.resize_edge = None
+    app.resize_margin = 4
+    app.min_width, app.min_height, app.max_width, app.max_height = 226, 26, 452, 52
+    app.win_w = app.win_h = None
+    app.track_geometry(100, 50, 226, 26)
+    app.pending_motion = app.motion_entry = None
+    app.motion_interval = 16
+    app.last_motion_applied = 0.0
+    return app
+
+
+def pointer(x, y):
+    # Window coordinates, with the window where the fixture put it.
+    return SimpleNamespace(x=x, y=y, x_root=100 + x, y_root=50 + y)
+
+
+@pytest.mark.parametrize('x, y, zone', [
+    (100, 13, ''),
+    (4, 4, ''), (221, 21, ''), (222, 22, ''),
+    (3, 13, 'w'), (223, 13, 'e'), (100, 3, 'n'), (100, 23, 's'),
+    (0, 0, 'nw'), (3, 23, 'sw'), (223, 3, 'ne'), (225, 25, 'se'),
+])
+def test_hit_zone_at_the_resize_margins(app, x, y, zone):
+    assert app.hit_zone(x, y) == zone
+
+
+def test_hit_zone_follows_a_resize(app):
+    app.track_geometry(100, 50, 300, 40)
+    assert (app.hit_zone(223, 23), app.hit_zone(296, 36), app.hit_zone(297, 37)) == ('', '', 'se')
+
+
+def test_a_burst_of_drag_motion_moves_the_window_once_per_frame(app):
+    app.start_potential_action(pointer(100, 13))
+    assert not app.is_resizing
+    for step in range(20):
+        app.on_motion(pointer(110 + step, 13))
+    app.clock.advance(0)
+    # Twenty events inside one frame interval: only the latest pointer is applied.
+    assert app.root.geometries == ['+129+50']
+    del app.root.geometries[:]
+    # Forty events a millisecond apart: one move per 16 ms frame, then the trailing pointer.
+    for step in range(40):
+        app.on_motion(pointer(130 + step, 13))
+        app.clock.advance(0.001)
+    app.clock.advance(0.016)
+    assert len(app.root.geometries) == 3
+    assert app.root.geometries[-1] == '+169+50'
+
+
+def test_a_burst_of_resize_motion_resizes_once_per_frame(app):
+    app.start_potential_action(pointer(225, 25))
+    assert (app.is_resizing, app.resize_edge) == (True, 'se')
+    for step in range(1, 11):
+        app.on_motion(pointer(225 + 3 * step, 25 + step))
+    app.clock.advance(0)
+    assert app.root.geometries == ['255x35+100+50']
+    # The zones follow the new size at once, without waiting for a Configure event.
+    assert (app.hit_zone(251, 31), app.hit_zone(252, 32)) == ('', 'se')
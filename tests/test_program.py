@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+import tickbar
+
+# Segments of 1, 2 and 3 seconds: offsets 0, 1 and 3, six seconds a cycle.
+SEGMENTS = [{'duration': 1.0, 'color': '#111111'}, {'duration': 2.0, 'color': '#222'},
+            {'duration': 3.0, 'sound': None}]
+
+
+@pytest.fixture
+def program():
+    return tickbar.IntervalProgram(SEGMENTS)
+
+
+@pytest.fixture
+def one_shot():
+    return tickbar.IntervalProgram(SEGMENTS, repeat=False)
+
+
+@pytest.mark.parametrize('elapsed, expected', [
+    (0.0, (0, 0, 0.0)),
+    (0.5, (0, 0, 0.5)),
+    # Exactly on a segment offset, the new segment has begun.
+    (1.0, (0, 1, 0.0)),
+    (2.999, (0, 1, 1.999)),
+    (3.0, (0, 2, 0.0)),
+    (5.999, (0, 2, 2.999)),
+    (6.0, (1, 0, 0.0)),
+    (13.0, (2, 1, 0.0)),
+    (14.5, (2, 1, 1.5)),
+])
+def test_locate(program, elapsed, expected):
+    cycle, index, into = program.locate(elapsed)
+    assert (cycle, index) == expected[:2]
+    assert into == pytest.approx(expected[2])
+
+
+def test_locate_one_shot(one_shot):
+    assert one_shot.locate(5.0) == (0, 2, 2.0)
+    assert one_shot.locate(6.0) == (1, None, 0.0)
+    assert one_shot.locate(60.0) == (10, None, 0.0)
+
+
+@pytest.mark.parametrize('elapsed, tick', [(0.0, 0), (0.999, 0), (1.0, 1), (3.0, 2), (6.0, 3), (13.0, 7)])
+def test_tick_at(program, elapsed, tick):
+    assert program.tick_at(elapsed) == tick
+
+
+def test_tick_at_past_the_end_of_a_one_shot(one_shot):
+    assert one_shot.tick_at(5.0) == 2
+    assert one_shot.tick_at(6.0) == one_shot.count
+
+
+@pytest.mark.parametrize('tick, offset', [(0, 0.0), (1, 1.0), (2, 3.0), (3, 6.0), (7, 13.0), (300, 600.0)])
+def test_boundary_offset(program, tick, offset):
+    assert program.boundary_offset(tick) == offset
+    assert program.tick_at(offset) == tick
+
+
+def test_boundary_offset_of_a_one_shot(one_shot):
+    assert [one_shot.boundary_offset(tick) for tick in range(5)] == [0.0, 1.0, 3.0, None, None]
+
+
+@pytest.mark.parametrize('elapsed, tick', [(-2.0, 0), (0.0, 0), (0.5, 1), (1.0, 1), (1.5, 2), (6.0, 3), (6.01, 4)])
+def test_next_tick_at(program, elapsed, tick):
+    assert program.next_tick_at(elapsed) == tick
+
+
+def test_fixed_program(program):
+    fixed = tickbar.IntervalProgram.fixed(6.0)
+    assert (fixed.count, fixed.total, fixed.uniform) == (1, 6.0, True)
+    assert not program.uniform
+    assert (program.total, program.count) == (6.0, 3)
+    assert list(program.offsets) == [0.0, 1.0, 3.0]
+    assert program.sounds == ['tick', 'tick', None]
+
+
+@pytest.mark.parametrize('segment, message', [
+    ({'duration': float('nan')}, 'finite'),
+    ({'duration': float('inf')}, 'finite'),
+    ({'duration': '-inf'}, 'finite'),
+    ({'duration': 0.05}, 'shorter'),
+    ({'duration': 1.0, 'color': '#12345'}, 'color'),
+    ({'duration': 1.0, 'color': '#ggg'}, 'color'),
+    ({'duration': 1.0, 'color': ''}, 'color'),
+    ({'duration': 1.0, 'color': 42}, 'color'),
+])
+def test_bad_segments_are_rejected(segment, message):
+    with pytest.raises(ValueError, match=message):
+        tickbar.IntervalProgram([{'duration': 1.0}, segment])
+
+
+def test_no_segments_are_rejected():
+    with pytest.raises(ValueError):
+        tickbar.IntervalProgram([])
+
+
+def write(folder, data):
+    path = os.path.join(folder, 'program.json')
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return path
+
+
+def test_load():
+    folder = tempfile.mkdtemp()
+    path = write(folder, {'name': 'drill', 'repeat': False, 'segments': [
+        {'duration': 2, 'color': 'orange', 'label': 'go'}, {'duration': 1, 'sound': 'bell.wav'}]})
+    program = tickbar.IntervalProgram.load(path)
+    assert (program.name, program.repeat, program.total, program.path) == ('drill', False, 3.0, path)
+    assert program.labels == ['go', '']
+    # Sound files are found next to the program.
+    assert program.sounds == ['tick', os.path.join(folder, 'bell.wav')]
+    assert program.sound_files() == {os.path.join(folder, 'bell.wav'): os.path.join(folder, 'bell.wav')}
+
+
+def test_load_a_bare_segment_list():
+    path = write(tempfile.mkdtemp(), [{'duration': 1.5}, {'duration': 2.5}])
+    program = tickbar.IntervalProgram.load(path)
+    assert (program.name, program.repeat, program.total) == ('program.json', True, 4.0)
+
+
+def test_load_checks_colors_with_the_caller():
+    path = write(tempfile.mkdtemp(), [{'duration': 1, 'color': 'orange'}, {'duration': 1, 'color': 'blurple'}])
+
+    def check_color(color):
+        if color not in ('orange', '#4CAF50'):
+            raise ValueError(f"unknown color: {color}")
+
+    with pytest.raises(ValueError, match='blurple'):
+        tickbar.IntervalProgram.load(path, check_color)
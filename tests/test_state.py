@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+import tickbar
+
+
+@pytest.fixture
+def path():
+    return os.path.join(tempfile.mkdtemp(), 'cache', 'default.bar0.state')
+
+
+def test_round_trip(path):
+    state = tickbar.BarState(path)
+    assert state.load() is None
+    state.save(1234.5, 6.0, True, False, (10, 20, 226, 26), '/tmp/program.json')
+    state.close()
+    state = tickbar.BarState(path)
+    assert state.load() == {'epoch': 1234.5, 'duration': 6.0, 'running': True, 'sound': False,
+                            'geometry': (10, 20, 226, 26), 'program': '/tmp/program.json'}
+    state.close()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="state files are only locked with flock")
+def test_second_writer_is_refused(path):
+    state = tickbar.BarState(path)
+    with pytest.raises(OSError):
+        tickbar.BarState(path)
+    state.close()
+    tickbar.BarState(path).close()
+
+
+def test_torn_write_is_ignored(path):
+    state = tickbar.BarState(path)
+    state.save(1.0, 6.0, True, True, (0, 0, 226, 26))
+    # A writer that died between its two sequence stores leaves the count odd.
+    state.SEQUENCE.pack_into(state.map, 0, state.sequence + 1)
+    assert state.load() is None
+    state.close()
+
+
+def test_resume_waits_for_the_next_boundary_on_the_saved_phase(path, make_bar):
+    state = tickbar.BarState(path)
+    state.save(time.time() - 2.5, 1.0, True, False, (0, 0, 226, 26))
+    saved = state.load()
+    state.close()
+    clock = tickbar.VirtualClock(start=100.0)
+    bar = make_bar(saved['duration'], clock=clock)
+    fired = []
+    bar.add_boundary_listener(lambda bar, tick, deadline, fired_at: fired.append((tick, deadline, fired_at)))
+    bar.resume(saved['epoch'])
+    assert bar.start_time == pytest.approx(97.5, abs=0.05)
+    # Half way through cycle 2: nothing is played until boundary 3, on the saved phase.
+    clock.advance(0.4)
+    assert fired == []
+    clock.advance(0.2)
+    assert fired == [(3, bar.start_time + 3.0, bar.start_time + 3.0)]
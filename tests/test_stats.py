@@ -0,0 +1,61 @@
+import pytest
+
+import tickbar
+
+
+def test_intervals_are_measured_between_calls_and_reset_forgets_the_last_one():
+    stats = tickbar.HotPathStats()
+    stats.record_interval('frame', 10.0)
+    assert stats.summary('frame') is None
+    stats.record_interval('frame', 10.016)
+    stats.record_interval('frame', 10.050)
+    stats.reset_interval('frame')
+    # The gap across a reset, e.g. while the bar was stopped, is never recorded.
+    stats.record_interval('frame', 70.0)
+    stats.record_interval('frame', 70.020)
+    stats.reset_interval('never seen')
+    summary = stats.summary('frame')
+    assert summary['count'] == 3
+    assert summary['max_ms'] == pytest.approx(34.0)
+    assert summary['mean_ms'] == pytest.approx((16 + 34 + 20) / 3)
+
+
+@pytest.mark.parametrize('count, p50, p99', [(1, 1, 1), (10, 6, 10), (100, 51, 100), (200, 101, 199)])
+def test_percentiles_of_the_recent_values(count, p50, p99):
+    stats = tickbar.HotPathStats()
+    for ms in reversed(range(1, count + 1)):
+        stats.record('op', ms / 1000)
+    summary = stats.summary('op')
+    assert (summary['p50_ms'], summary['p99_ms']) == (pytest.approx(p50), pytest.approx(p99))
+
+
+def test_percentiles_cover_the_ring_while_counts_cover_everything():
+    stats = tickbar.HotPathStats(history=4)
+    for ms in (100, 100, 1, 2, 3, 4):
+        stats.record('op', ms / 1000)
+    summary = stats.summary('op')
+    assert (summary['count'], summary['max_ms'], summary['mean_ms']) == (6, 100, 35)
+    assert (summary['p50_ms'], summary['p99_ms']) == (3, 4)
+
+
+def test_histogram_buckets_include_their_upper_bound():
+    stats = tickbar.HotPathStats()
+    for ms in (0.01, 0.05, 0.06, 16, 16.5, 1000, 5000):
+        stats.record('op', ms / 1000)
+    histogram = stats.snapshot()['op']['histogram']
+    assert histogram == {'<=0.05': 2, '<=0.1': 1, '<=16': 1, '<=33': 1, '<=1000': 1, '>1000': 1}
+    assert stats.line('op', 'missing') == 'op     -'
+
+
+def test_a_restarted_bar_does_not_record_the_stopped_time_as_a_frame(make_bar):
+    clock = tickbar.VirtualClock()
+    bar = make_bar(1.0, clock=clock)
+    bar.stats = tickbar.HotPathStats()
+    key = bar.metric_keys['frame_interval']
+    bar.start()
+    clock.advance(2.0)
+    bar.stop()
+    clock.advance(60.0)
+    bar.start()
+    clock.advance(2.0)
+    assert bar.stats.summary(key)['max_ms'] < 1000
@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+import tickbar
+
+
+@pytest.fixture
+def folder():
+    return tempfile.mkdtemp()
+
+
+def write_program(folder, durations):
+    path = os.path.join(folder, 'program.json')
+    with open(path, 'w') as f:
+        json.dump({'segments': [{'duration': duration, 'color': '#2196F3'} for duration in durations]}, f)
+    return path
+
+
+def test_follower_adopts_a_program_file(make_bar, folder):
+    sync_path = os.path.join(folder, 'phase')
+    publisher = make_bar(tickbar.IntervalProgram.load(write_program(folder, [1.0, 2.0, 3.0])))
+    follower = make_bar(6.0)
+    assert publisher.enable_sync('publish', sync_path)
+    publisher.start()
+    assert follower.enable_sync('follow', sync_path)
+    assert follower.is_running
+    assert follower.start_time == publisher.start_time
+    assert list(follower.program.durations) == [1.0, 2.0, 3.0]
+    assert follower.program.path == publisher.program.path
+
+
+def test_follower_refuses_a_program_it_cannot_rebuild(make_bar, folder):
+    sync_path = os.path.join(folder, 'phase')
+    publisher = make_bar(tickbar.IntervalProgram([{'duration': 1.0}, {'duration': 5.0}]))
+    follower = make_bar(6.0)
+    publisher.enable_sync('publish', sync_path)
+    publisher.start()
+    follower.enable_sync('follow', sync_path)
+    # Same total, different segments: following it as one 6 s segment would tick at the wrong times.
+    assert not follower.is_running
+    assert follower.program.count == 1
+    publisher.set_program(tickbar.IntervalProgram.fixed(4.0))
+    assert follower.apply_sync()
+    assert follower.program.total == 4.0 and follower.start_time == publisher.start_time
+
+
+def test_close_cancels_the_sync_poll(make_bar, folder):
+    sync_path = os.path.join(folder, 'phase')
+    follower = make_bar(6.0)
+    follower.enable_sync('follow', sync_path)
+    assert follower.sync_entry is not None
+    follower.close()
+    assert follower.sync_entry is None and follower.phase_sync is None
+
+
+def test_mid_cycle_join_waits_for_the_next_boundary(make_bar, folder):
+    sync_path = os.path.join(folder, 'phase')
+    publisher = make_bar(0.4)
+    follower = make_bar(0.4)
+    publisher.enable_sync('publish', sync_path)
+    publisher.start(publisher.clock.now() - 0.25)
+    fired = []
+    follower.add_boundary_listener(lambda bar, tick, deadline, fired_at: fired.append((tick, deadline)))
+    follower.enable_sync('follow', sync_path)
+    time.sleep(0.3)
+    # Nothing was played on joining; the first tick is the publisher's next one.
+    assert fired and fired[0] == (1, publisher.start_time + 0.4)
@@ -0,0 +1,24 @@
+import io
+import time
+
+import tickbar
+
+
+class SlowOpening(tickbar.RecordingAudioBackend):
+    """ An audio device that takes a moment to open, as a real one can at startup """
+    def open(self):
+        time.sleep(0.1)
+
+
+def test_first_tick_is_heard_while_audio_is_still_loading():
+    bank = tickbar.SoundBank(SlowOpening())
+    bank.preload({'tick': 'tick.wav'})
+    clock = tickbar.VirtualClock(start=5.0)
+    out = io.StringIO()
+    program = tickbar.IntervalProgram([{'duration': 0.5}, {'duration': 1.0, 'sound': None}])
+    assert tickbar.TerminalBar(program, bank, out=out, width=40, clock=clock).run(cycles=3) == 0
+    # Piped output prints each boundary at its offset on the virtual clock.
+    assert out.getvalue().splitlines() == [f"tick {tick} {program.boundary_offset(tick):.6f}" for tick in range(6)]
+    # Boundary 0 is played, not dropped for want of decoded sounds, and so is the one closing the last cycle;
+    # the silent segments play nothing.
+    assert [sound for sound, *_ in bank.backend.log] == ['tick.wav'] * 4
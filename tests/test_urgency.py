@@ -0,0 +1,84 @@
+import pytest
+
+import tickbar
+
+GREEN, AMBER, RED = '#4CAF50', '#FFC107', '#F44336'
+
+
+def distance(a, b):
+    return sum(abs(int(a[i:i + 2], 16) - int(b[i:i + 2], 16)) for i in (1, 3, 5))
+
+
+def test_lut_keeps_the_colour_for_the_first_80_percent():
+    lut = tickbar.build_urgency_lut(GREEN)
+    assert len(lut) == tickbar.URGENCY_STEPS == 50
+    # Bucket 39 ends at 80% of the segment, so it is the last plain one.
+    assert lut[:40] == [GREEN] * 40
+    assert lut[40] != GREEN
+    assert lut[-1] == RED
+
+
+def test_lut_goes_through_amber_to_red():
+    lut = tickbar.build_urgency_lut(GREEN)
+    ramp = lut[39:]
+    # Towards amber for the first half of the ramp, then towards red, never turning back.
+    to_amber = [distance(color, AMBER) for color in ramp[:6]]
+    to_red = [distance(color, RED) for color in ramp[6:]]
+    assert to_amber == sorted(to_amber, reverse=True)
+    assert to_red == sorted(to_red, reverse=True)
+    assert min(distance(color, AMBER) for color in ramp) < distance(GREEN, AMBER) / 8
+
+
+@pytest.mark.parametrize('steps, expected', [
+    (11, [GREEN] * 9 + [AMBER, RED]),
+    (6, [GREEN] * 5 + [RED]),
+])
+def test_lut_thresholds_with_fewer_steps(steps, expected):
+    assert tickbar.build_urgency_lut(GREEN, steps=steps) == expected
+
+
+@pytest.mark.parametrize('color', ['orange', '#FFF', '#FFFFFFFFFFFF'])
+def test_lut_of_a_colour_it_cannot_mix_is_flat(color):
+    assert tickbar.build_urgency_lut(color) == [color] * tickbar.URGENCY_STEPS
+
+
+class StandInStyle:
+    def __init__(self):
+        self.configured = []
+
+    def configure(self, name, **options):
+        self.configured.append(name)
+
+
+class StandInProgressbar:
+    """ Records every style the bar switches to """
+    def __init__(self, parent, style, **options):
+        self.styles = [style]
+
+    def configure(self, style):
+        self.styles.append(style)
+
+    def __setitem__(self, option, value):
+        pass
+
+
+def test_a_cycle_only_switches_between_pre_registered_styles(monkeypatch, make_bar):
+    monkeypatch.setattr(tickbar.ttk, 'Progressbar', StandInProgressbar)
+    clock = tickbar.VirtualClock()
+    program = tickbar.IntervalProgram([{'duration': 1.0, 'color': GREEN}, {'duration': 2.0, 'color': '#2196F3'},
+                                       {'duration': 1.0, 'color': 'orange'}])
+    bar = make_bar(program, clock=clock)
+    style = StandInStyle()
+    bar.renderer = tickbar.TtkBarRenderer(None, style, {})
+    bar.set_urgency(True)
+    registered = list(style.configured)
+    assert len(registered) == len(set(registered))
+    bar.start()
+    clock.advance(8.0)
+    used = set(bar.renderer.widget.styles[1:])
+    names = bar.renderer.color_styles
+    # The ramps were shown through to red, and the frame loop never had to register a style.
+    assert {names[GREEN], names['#2196F3'], names['orange'], names[RED]} <= used
+    assert len(used) > 10
+    assert used <= set(registered)
+    assert style.configured == registered
@@ -1,35 +1,974 @@
 #!/usr/bin/env python3
-import tkinter as tk
-from tkinter import ttk, Menu
-import signal
+import time
+IMPORT_STARTED = time.perf_counter()
 import sys
+import argparse
+import json
+import signal
 import platform
-import time
+import math
+import bisect
+import heapq
+import itertools
 import threading
+import queue
 import os
+import shutil
+import mmap
+import struct
+import socket
+import errno
+import tempfile
+import wave
+import abc
+from array import array
+from collections import deque
 from subprocess import PIPE
 
+# Imported on first use by the GUI, so terminal mode never pays for tkinter or needs it installed.
+tk = ttk = Menu = tkfont = None
+
+def load_tk():
+    global tk, ttk, Menu, tkfont
+    if tk is None:
+        import tkinter
+        from tkinter import ttk, Menu, font as tkfont
+        tk = tkinter
+    return tk
+
 def resource_path(relative_path):
     """ Get absolute path to resource, works for PyInstaller or normal run """
     if hasattr(sys, '_MEIPASS'):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
+class StartupProfile:
+    """ Records named milestones relative to the start of module import """
+    def __init__(self, started=IMPORT_STARTED):
+        self.started = started
+        self.marks = []
+
+    def mark(self, name):
+        if not self.has(name):
+            self.marks.append((name, time.perf_counter()))
+
+    def has(self, name):
+        return any(mark == name for mark, _ in self.marks)
+
+    def report(self):
+        parts = []
+        previous = self.started
+        for name, at in self.marks:
+            parts.append(f"{name} +{(at - previous) * 1000:.1f} ms")
+            previous = at
+        total = (previous - self.started) * 1000
+        return f"Startup: {', '.join(parts)} (total {total:.1f} ms)"
+
+STARTUP = StartupProfile()
+
+def cache_path(name):
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'tickbar', name)
+
+def load_cached_geometry():
+    try:
+        with open(cache_path('monitor.json')) as f:
+            x, y, width, height = json.load(f)
+        return int(x), int(y), int(width), int(height)
+    except (OSError, ValueError, TypeError):
+        return None
+
+def save_cached_geometry(geometry):
+    path = cache_path('monitor.json')
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(list(geometry), f)
+    except OSError as e:
+        print(f"Geometry cache error: {e}")
+
+def probe_monitor_geometry():
+    """ Primary monitor (x, y, width, height) from the platform, or None; never touches Tk """
+    if platform.system() == "Windows":
+        try:
+            from ctypes import windll, Structure, c_long, byref
+            class RECT(Structure):
+                _fields_ = [('left', c_long), ('top', c_long), ('right', c_long), ('bottom', c_long)]
+            rect = RECT()
+            if windll.user32.SystemParametersInfoW(0x0030, 0, byref(rect), 0):
+                width = rect.right - rect.left
+                height = rect.bottom - rect.top
+                return rect.left, rect.top, width, height
+        except Exception as e:
+            print(f"Windows monitor detection error: {e}")
+    elif platform.system() == "Linux":
+        try:
+            import subprocess
+            result = subprocess.run(['xrandr', '--query'], stdout=PIPE, stderr=PIPE, text=True)
+            lines = result.stdout.split('\n')
+            for line in lines:
+                if ' connected primary' in line:
+                    parts = line.split()
+                    for part in parts:
+                        if '+' in part and 'x' in part:
+                            size, x_offset, y_offset = part.split('+')
+                            width, height = map(int, size.split('x'))
+                            x = int(x_offset)
+                            y = int(y_offset)
+                            return x, y, width, height
+        except Exception as e:
+            print(f"Linux monitor detection error: {e}")
+    return None
+
+INTRO_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#4CAF50']
+
+def build_intro_keyframes(width, height, x, y, max_steps=240):
+    """ Precompute the startup effect as (geometry, colour index, value, text) per 16 ms frame """
+    expanded_width = int(width * 1.5)
+    expanded_height = int(height * 1.5)
+    expanded_x = x - (expanded_width - width) // 2
+    expanded_y = y - (expanded_height - height) // 2
+    keyframes = []
+    geometry = (width, height, x, y)
+    for step in range(max_steps):
+        if step < 30:
+            ease = 1 - (1 - step / 30) ** 3
+            geometry = (int(width + (expanded_width - width) * ease),
+                        int(height + (expanded_height - height) * ease),
+                        int(x + (expanded_x - x) * ease),
+                        int(y + (expanded_y - y) * ease))
+        elif step > max_steps - 60:
+            ease = ((step - (max_steps - 60)) / 60) ** 2
+            geometry = (int(expanded_width - (expanded_width - width) * ease),
+                        int(expanded_height - (expanded_height - height) * ease),
+                        int(expanded_x - (expanded_x - x) * ease),
+                        int(expanded_y - (expanded_y - y) * ease))
+
+        wave_progress = (math.sin(step * 0.1) + 1) / 2
+        linear_progress = min(1.0, step / (max_steps - 80))
+        value = min((wave_progress * 0.1 + linear_progress * 1) * 100, 100)
+        color_index = int((step / 25) % len(INTRO_COLORS))
+        text = ''
+        if step > max_steps - 80:
+            if step == max_steps - 79:
+                value = 100
+                color_index = len(INTRO_COLORS) - 1
+            chars_to_show = min(9, (step - (max_steps - 80)) // 8)
+            text = "T I C K B A R"[:chars_to_show * 2 - 1] if chars_to_show > 0 else ""
+        keyframes.append((geometry, color_index, value, text))
+    return keyframes
+
+class RealClock:
+    """ perf_counter time, with timers run by Tk's event loop """
+    virtual = False
+
+    def __init__(self, widget):
+        self.widget = widget
+
+    def now(self):
+        return time.perf_counter()
+
+    def after(self, delay_ms, callback):
+        return self.widget.after(delay_ms, callback)
+
+    def after_cancel(self, timer_id):
+        self.widget.after_cancel(timer_id)
+
+    def call_at(self, deadline, callback):
+        return self.widget.after(max(0, int(math.ceil((deadline - time.perf_counter()) * 1000))), callback)
+
+class VirtualClock:
+    """ Simulated time that only moves when advanced, firing due timers in deadline order on the way """
+    virtual = True
+
+    def __init__(self, start=0.0):
+        self.time = start
+        self.timers = []
+        self.counter = itertools.count()
+        self.fired = 0
+
+    def now(self):
+        return self.time
+
+    def after(self, delay_ms, callback):
+        return self.call_at(self.time + delay_ms / 1000, callback)
+
+    def after_cancel(self, timer_id):
+        timer_id[2] = None
+
+    def call_at(self, deadline, callback):
+        timer = [max(deadline, self.time), next(self.counter), callback]
+        heapq.heappush(self.timers, timer)
+        return timer
+
+    def advance_to(self, target):
+        while self.timers and self.timers[0][0] <= target:
+            deadline, _, callback = heapq.heappop(self.timers)
+            if callback is None:
+                continue
+            self.time = deadline
+            self.fired += 1
+            try:
+                callback()
+            except Exception as e:
+                print(f"Virtual timer error: {e}")
+        self.time = max(self.time, target)
+
+    def advance(self, seconds):
+        self.advance_to(self.time + seconds)
+
+def is_hex(text):
+    return all(c in '0123456789abcdefABCDEF' for c in text)
+
+class IntervalProgram:
+    """ Segments compiled once into cumulative offsets, so a frame finds its segment with one binary search """
+    min_segment = 0.1
+
+    def __init__(self, segments, repeat=True, name=None):
+        if not segments:
+            raise ValueError("a program needs at least one segment")
+        self.name = name
+        self.path = None
+        self.repeat = repeat
+        self.offsets = array('d')
+        self.durations = array('d')
+        self.colors = []
+        self.sounds = []
+        self.labels = []
+        total = 0.0
+        for segment in segments:
+            duration = float(segment['duration'])
+            # NaN compares false with everything, so it has to be ruled out before the minimum is checked.
+            if not math.isfinite(duration):
+                raise ValueError(f"segment duration must be a finite number: {duration}")
+            if duration < self.min_segment:
+                raise ValueError(f"segment shorter than {self.min_segment}s: {duration}")
+            color = segment.get('color', '#4CAF50')
+            if not isinstance(color, str) or not color or \
+                    color.startswith('#') and (len(color) not in (4, 7, 10, 13) or not is_hex(color[1:])):
+                raise ValueError(f"bad segment color: {color!r}")
+            self.offsets.append(total)
+            self.durations.append(duration)
+            self.colors.append(color)
+            self.sounds.append(segment.get('sound', 'tick'))
+            self.labels.append(segment.get('label', ''))
+            total += duration
+        self.total = total
+        self.count = len(self.durations)
+        # One repeating 'tick' segment is what the streaming mixer can place on its own.
+        self.uniform = repeat and self.count == 1 and self.sounds[0] == 'tick'
+
+    @classmethod
+    def fixed(cls, duration):
+        return cls([{'duration': duration}])
+
+    @classmethod
+    def load(cls, path, check_color=None):
+        """ {"name": ..., "repeat": true, "segments": [{"duration": s, "color": ..., "sound": ..., "label": ...}]}
+
+        check_color(color) raises ValueError for a colour the caller can't draw, e.g. an unknown Tk colour name.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {'segments': data}
+        base = os.path.dirname(os.path.abspath(path))
+        segments = []
+        for segment in data['segments']:
+            segment = dict(segment)
+            # Sounds other than the built-in tick are wav files next to the program.
+            if segment.get('sound', 'tick') not in (None, 'tick'):
+                segment['sound'] = os.path.join(base, segment['sound'])
+            segments.append(segment)
+        program = cls(segments, repeat=data.get('repeat', True), name=data.get('name') or os.path.basename(path))
+        program.path = os.path.abspath(path)
+        if check_color is not None:
+            for color in set(program.colors):
+                check_color(color)
+        return program
+
+    def sound_files(self):
+        return {sound: sound for sound in self.sounds if sound not in (None, 'tick')}
+
+    def locate(self, elapsed):
+        """ (cycle, segment index, seconds into the segment); the index is None once a one-shot program ends """
+        cycle, offset = divmod(elapsed, self.total)
+        if cycle >= 1 and not self.repeat:
+            return int(cycle), None, 0.0
+        index = bisect.bisect_right(self.offsets, offset) - 1
+        return int(cycle), index, offset - self.offsets[index]
+
+    def tick_at(self, elapsed):
+        """ Number of the boundary that started the segment in progress """
+        cycle, index, _ = self.locate(elapsed)
+        return self.count if index is None else cycle * self.count + index
+
+    def boundary_offset(self, tick):
+        """ Seconds from the program start to boundary `tick`, or None past the end of a one-shot program """
+        cycle, index = divmod(tick, self.count)
+        if cycle and not self.repeat:
+            return None
+        return cycle * self.total + self.offsets[index]
+
+    def next_tick_at(self, elapsed):
+        """ Number of the first boundary at or after `elapsed`, for joining a cycle that is already under way """
+        if elapsed <= 0:
+            return 0
+        tick = self.tick_at(elapsed)
+        return tick if self.boundary_offset(tick) == elapsed else tick + 1
+
+class TimingEngine:
+    """ Fires cycle boundaries from a dedicated thread, independent of Tk latency """
+    def __init__(self, spin_margin=None, clock=None):
+        if spin_margin is None:
+            # Condition.wait() timeouts are only ~15 ms accurate on Windows.
+            spin_margin = 0.016 if platform.system() == "Windows" else 0.002
+        self.spin_margin = spin_margin
+        # A virtual clock has no thread: boundaries become timers on the clock and fire exactly on time.
+        self.clock = clock
+        self.virtual = clock is not None and clock.virtual
+        self.virtual_timer = None
+        self.timers = {}
+        self.cond = threading.Condition()
+        self.thread = None
+        self.closed = False
+
+    def now(self):
+        return self.clock.now() if self.clock is not None else time.perf_counter()
+
+    def start_timer(self, key, start_time, program, callback, first_tick=None):
+        # By default the boundary of the segment in progress fires straight away, as a click does.
+        if first_tick is None:
+            first_tick = program.tick_at(max(0.0, self.now() - start_time))
+        next_tick = first_tick
+        with self.cond:
+            self.timers[key] = [start_time, program, next_tick, callback]
+            if self.virtual:
+                self.rearm_virtual()
+                return
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="tickbar-timing", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def stop_timer(self, key):
+        with self.cond:
+            self.timers.pop(key, None)
+            if self.virtual:
+                self.rearm_virtual()
+            self.cond.notify()
+
+    def shutdown(self):
+        with self.cond:
+            self.closed = True
+            self.timers.clear()
+            if self.virtual:
+                self.rearm_virtual()
+            self.cond.notify()
+
+    def rearm_virtual(self):
+        if self.virtual_timer is not None:
+            self.clock.after_cancel(self.virtual_timer)
+            self.virtual_timer = None
+        key, deadline = self.next_deadline()
+        if key is not None:
+            self.virtual_timer = self.clock.call_at(deadline, self.fire_virtual)
+
+    def fire_virtual(self):
+        self.virtual_timer = None
+        now = self.clock.now()
+        while True:
+            key, deadline = self.next_deadline()
+            if key is None or deadline > now:
+                break
+            timer = self.timers[key]
+            tick_number = timer[2]
+            timer[2] += 1
+            try:
+                timer[3](tick_number, deadline, now)
+            except Exception as e:
+                print(f"Timing callback error: {e}")
+        self.rearm_virtual()
+
+    def next_deadline(self):
+        key, deadline = None, None
+        for timer_key, (start_time, program, next_tick, _) in self.timers.items():
+            offset = program.boundary_offset(next_tick)
+            if offset is None:
+                continue
+            timer_deadline = start_time + offset
+            if deadline is None or timer_deadline < deadline:
+                key, deadline = timer_key, timer_deadline
+        return key, deadline
+
+    def run(self):
+        with self.cond:
+            while not self.closed:
+                key, deadline = self.next_deadline()
+                if key is None:
+                    self.cond.wait()
+                    continue
+                timeout = deadline - self.now() - self.spin_margin
+                if timeout > 0:
+                    self.cond.wait(timeout)
+                    continue
+                timer = self.timers[key]
+                # Release the lock while spinning so start/stop calls never block on us.
+                self.cond.release()
+                now = self.now
+                try:
+                    while now() < deadline:
+                        pass
+                    fired_at = now()
+                finally:
+                    self.cond.acquire()
+                if self.timers.get(key) is not timer:
+                    continue
+                tick_number = timer[2]
+                timer[2] += 1
+                # Callbacks play sound and feed listeners; run unlocked so a slow one never blocks start/stop.
+                callback = timer[3]
+                self.cond.release()
+                try:
+                    callback(tick_number, deadline, fired_at)
+                except Exception as e:
+                    print(f"Timing callback error: {e}")
+                finally:
+                    self.cond.acquire()
+
+class HotPathStats:
+    """ Ring buffers and fixed-bucket histograms of hot-path timings, kept in milliseconds """
+    BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 125, 250, 500, 1000)
+
+    def __init__(self, history=512):
+        self.history = history
+        self.series = {}
+        self.last_seen = {}
+
+    def record(self, name, seconds):
+        series = self.series.get(name)
+        if series is None:
+            # recent values, histogram counts, count, total, max
+            series = self.series[name] = [deque(maxlen=self.history), [0] * (len(self.BUCKETS_MS) + 1), 0, 0.0, 0.0]
+        ms = seconds * 1000
+        series[0].append(ms)
+        series[1][bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        series[2] += 1
+        series[3] += ms
+        if ms > series[4]:
+            series[4] = ms
+
+    def record_interval(self, name, now):
+        last = self.last_seen.get(name)
+        self.last_seen[name] = now
+        if last is not None:
+            self.record(name, now - last)
+
+    def reset_interval(self, name):
+        self.last_seen.pop(name, None)
+
+    def summary(self, name):
+        series = self.series.get(name)
+        if series is None or not series[0]:
+            return None
+        recent = sorted(series[0])
+        return {
+            'count': series[2],
+            'mean_ms': series[3] / series[2],
+            'max_ms': series[4],
+            'p50_ms': recent[len(recent) // 2],
+            'p99_ms': recent[min(len(recent) - 1, len(recent) * 99 // 100)],
+        }
+
+    def snapshot(self):
+        report = {}
+        for name, series in list(self.series.items()):
+            summary = self.summary(name)
+            if summary is None:
+                continue
+            labels = [f'<={bound}' for bound in self.BUCKETS_MS] + [f'>{self.BUCKETS_MS[-1]}']
+            summary['histogram'] = {label: count for label, count in zip(labels, series[1]) if count}
+            report[name] = summary
+        return report
+
+    def line(self, label, name):
+        summary = self.summary(name)
+        if summary is None:
+            return f"{label:<6} -"
+        return f"{label:<6} p50 {summary['p50_ms']:6.2f}  p99 {summary['p99_ms']:6.2f}  max {summary['max_ms']:6.2f} ms"
+
+class FrameScheduler:
+    """ One clock timer shared by every bar; callbacks due within the same millisecond share a wakeup """
+    def __init__(self, clock, slack=0.0005):
+        self.clock = clock
+        # Virtual time is exact, so there is nothing to absorb.
+        self.slack = 0.0 if clock.virtual else slack
+        self.entries = []
+        self.counter = itertools.count()
+        self.after_id = None
+        self.after_deadline = None
+
+    def call_later(self, delay_ms, callback):
+        entry = [self.clock.now() + delay_ms / 1000, next(self.counter), callback]
+        heapq.heappush(self.entries, entry)
+        self.rearm()
+        return entry
+
+    def cancel(self, entry):
+        # Lazy removal: the entry is skipped when it reaches the top of the heap.
+        entry[2] = None
+
+    def rearm(self):
+        while self.entries and self.entries[0][2] is None:
+            heapq.heappop(self.entries)
+        if not self.entries:
+            if self.after_id is not None:
+                self.clock.after_cancel(self.after_id)
+                self.after_id = None
+            return
+        deadline = self.entries[0][0]
+        if self.after_id is not None:
+            if self.after_deadline <= deadline:
+                return
+            self.clock.after_cancel(self.after_id)
+        self.after_deadline = deadline
+        self.after_id = self.clock.call_at(deadline, self.run)
+
+    def run(self):
+        self.after_id = None
+        now = self.clock.now() + self.slack
+        due = []
+        while self.entries and self.entries[0][0] <= now:
+            callback = heapq.heappop(self.entries)[2]
+            if callback is not None:
+                due.append(callback)
+        for callback in due:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Scheduler callback error: {e}")
+        self.rearm()
+
+class AudioBackend(abc.ABC):
+    """ Interface the sound bank drives; open() may be slow and runs off the Tk thread """
+    streaming = False
+
+    def open(self):
+        pass
+
+    @abc.abstractmethod
+    def decode(self, path):
+        pass
+
+    def reserve_channels(self, count):
+        return list(range(count))
+
+    def channel_busy(self, channel):
+        return False
+
+    @abc.abstractmethod
+    def play(self, sound, channel, requested_at):
+        pass
+
+    def schedule_ticks(self, key, sound, start_time, duration, first_tick):
+        pass
+
+    def clear_ticks(self, key):
+        pass
+
+    def note_boundary(self, key, tick, fired_at):
+        pass
+
+    def gap_stats(self):
+        return None
+
+    def close(self):
+        pass
+
+class NullAudioBackend(AudioBackend):
+    def decode(self, path):
+        return path
+
+    def play(self, sound, channel, requested_at):
+        pass
+
+class RecordingAudioBackend(NullAudioBackend):
+    """ Logs (sound, channel, requested_at, played_at) so headless runs can measure latency """
+    def __init__(self):
+        self.log = []
+        self.lock = threading.Lock()
+
+    def play(self, sound, channel, requested_at):
+        played_at = time.perf_counter()
+        with self.lock:
+            self.log.append((sound, channel, requested_at, played_at))
+
+    def latencies(self):
+        with self.lock:
+            return [played_at - requested_at for _, _, requested_at, played_at in self.log]
+
+class PygameAudioBackend(AudioBackend):
+    def __init__(self, frequency=22050, buffer=512):
+        self.frequency = frequency
+        self.buffer = buffer
+        self.pygame = None
+
+    def open(self):
+        os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+        import contextlib
+        with contextlib.redirect_stdout(open(os.devnull, 'w')), \
+                contextlib.redirect_stderr(open(os.devnull, 'w')):
+            import pygame
+            pygame.mixer.pre_init(frequency=self.frequency, size=-16, channels=2, buffer=self.buffer)
+            pygame.mixer.init()
+        self.pygame = pygame
+
+    def decode(self, path):
+        return self.pygame.mixer.Sound(path)
+
+    def reserve_channels(self, count):
+        self.pygame.mixer.set_reserved(count)
+        return [self.pygame.mixer.Channel(i) for i in range(count)]
+
+    def channel_busy(self, channel):
+        return channel.get_busy()
+
+    def play(self, sound, channel, requested_at):
+        channel.play(sound)
+
+    def close(self):
+        if self.pygame is not None:
+            self.pygame.mixer.quit()
+
+def decode_wav(path, rate, channels):
+    """ Read a PCM wav as interleaved signed 16-bit samples at the given rate and channel count """
+    with wave.open(path, 'rb') as wav:
+        src_rate = wav.getframerate()
+        src_channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = array('h', ((b - 128) << 8 for b in raw))
+    elif width == 2:
+        samples = array('h', raw)
+    elif width == 4:
+        # readframes already hands back host byte order, so each word's top half is its high 16 bits.
+        samples = array('h', (v >> 16 for v in array('i', raw)))
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8} bits")
+    frames = len(samples) // src_channels
+    out_frames = frames * rate // src_rate
+    out = array('h', bytes(out_frames * channels * 2))
+    for i in range(out_frames):
+        src = (i * src_rate // rate) * src_channels
+        for c in range(channels):
+            out[i * channels + c] = samples[src + min(c, src_channels - 1)]
+    return out
+
+class StreamingAudioBackend(AudioBackend):
+    """ One continuous PCM stream with each tick mixed in at the sample offset of its cycle boundary """
+    streaming = True
+
+    def __init__(self, rate=44100, channels=2, chunk_frames=512, drift_gain=0.02):
+        self.rate = rate
+        self.channels = channels
+        self.chunk_frames = chunk_frames
+        self.drift_gain = drift_gain
+        self.lock = threading.Lock()
+        self.device = None
+        self.position = 0
+        self.stream_epoch = None
+        self.clock_error = 0.0
+        self.schedules = {}
+        self.voices = []
+        self.gaps = deque(maxlen=256)
+        # When each streamed tick is heard and when the bar drew its boundary, until the other half arrives.
+        self.heard = {}
+        self.fired = {}
+
+    def open(self):
+        os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        import contextlib
+        with contextlib.redirect_stdout(open(os.devnull, 'w')), \
+                contextlib.redirect_stderr(open(os.devnull, 'w')):
+            import pygame
+            from pygame._sdl2 import audio as sdl2_audio
+            pygame.init()
+            pygame.mixer.quit()
+        if hasattr(sdl2_audio, 'get_audio_device_names'):
+            names = sdl2_audio.get_audio_device_names(False)
+        else:
+            names = [sdl2_audio.get_audio_device_name(i, 0) for i in range(sdl2_audio.get_num_audio_devices(0))]
+        if not names:
+            raise RuntimeError("no audio output device")
+        self.device = sdl2_audio.AudioDevice(
+            devicename=names[0], iscapture=False, frequency=self.rate,
+            audioformat=sdl2_audio.AUDIO_S16, numchannels=self.channels,
+            chunksize=self.chunk_frames, allowed_changes=0, callback=self.fill)
+        self.device.pause(0)
+
+    def decode(self, path):
+        return decode_wav(path, self.rate, self.channels)
+
+    def play(self, sound, channel, requested_at):
+        with self.lock:
+            self.voices.append((self.position, sound))
+
+    def schedule_ticks(self, key, sound, start_time, duration, first_tick):
+        with self.lock:
+            self.schedules[key] = [sound, start_time, duration, first_tick]
+            self.forget(key)
+
+    def clear_ticks(self, key):
+        with self.lock:
+            self.schedules.pop(key, None)
+            self.forget(key)
+
+    def forget(self, key):
+        # Tick numbers start over with a new schedule, so halves left from the old one would pair wrongly.
+        for table in (self.heard, self.fired):
+            for pending in [pending for pending in table if pending[0] == key]:
+                del table[pending]
+
+    def note_boundary(self, key, tick, fired_at):
+        with self.lock:
+            self.pair(key, tick, self.fired, fired_at, self.heard)
+
+    def pair(self, key, tick, table, when, other):
+        # gap = heard - fired, whichever of the two comes in first.
+        match = other.pop((key, tick), None)
+        if match is None:
+            table[(key, tick)] = when
+            if len(table) > 64:
+                del table[next(iter(table))]
+        elif table is self.heard:
+            self.gaps.append(when - match)
+        else:
+            self.gaps.append(match - when)
+
+    def fill(self, device, stream):
+        # SDL audio thread. The chunk handed to us is heard once the chunk in flight has drained.
+        heard_at = time.perf_counter() + self.chunk_frames / self.rate
+        frames = len(stream) // (2 * self.channels)
+        with self.lock:
+            if self.stream_epoch is None:
+                self.stream_epoch = heard_at - self.position / self.rate
+            else:
+                self.clock_error = heard_at - (self.stream_epoch + self.position / self.rate)
+                self.stream_epoch += self.clock_error * self.drift_gain
+            out = self.render(self.position, frames)
+            self.position += frames
+        stream[:] = out.tobytes()
+
+    def render(self, pos, frames):
+        end = pos + frames
+        if self.stream_epoch is not None:
+            for key, schedule in self.schedules.items():
+                sound, start_time, duration, next_tick = schedule
+                while True:
+                    boundary = start_time + next_tick * duration
+                    frame = round((boundary - self.stream_epoch) * self.rate)
+                    if frame >= end:
+                        break
+                    # A boundary already behind the stream plays at once rather than truncated.
+                    frame = max(frame, pos)
+                    self.voices.append((frame, sound))
+                    self.pair(key, next_tick, self.heard, self.stream_epoch + frame / self.rate, self.fired)
+                    next_tick += 1
+                schedule[3] = next_tick
+        return self.mix(pos, end)
+
+    def mix(self, pos, end):
+        ch = self.channels
+        out = array('h', bytes((end - pos) * ch * 2))
+        live = []
+        overlapping = []
+        for start, samples in self.voices:
+            stop = start + len(samples) // ch
+            if stop <= pos:
+                continue
+            live.append((start, samples))
+            if start < end:
+                overlapping.append((start, stop, samples))
+        self.voices = live
+        for start, stop, samples in overlapping:
+            a = max(start, pos)
+            b = min(stop, end)
+            src = samples[(a - start) * ch:(b - start) * ch]
+            i = (a - pos) * ch
+            if len(overlapping) == 1:
+                out[i:i + len(src)] = src
+            else:
+                for j, v in enumerate(src):
+                    v += out[i + j]
+                    out[i + j] = 32767 if v > 32767 else -32768 if v < -32768 else v
+        return out
+
+    def gap_stats(self):
+        with self.lock:
+            gaps = list(self.gaps)
+            clock_error = self.clock_error
+        if not gaps:
+            return None
+        return {
+            'ticks': len(gaps),
+            'mean_gap_ms': sum(gaps) / len(gaps) * 1000,
+            'max_gap_ms': max(abs(g) for g in gaps) * 1000,
+            'clock_error_ms': clock_error * 1000,
+        }
+
+    def close(self):
+        if self.device is not None:
+            self.device.pause(1)
+            self.device.close()
+
+AUDIO_BACKENDS = {
+    'pygame': PygameAudioBackend,
+    'stream': StreamingAudioBackend,
+    'null': NullAudioBackend,
+    'recording': RecordingAudioBackend,
+}
+
+def env_audio_backend():
+    """ The backend named by TICKBAR_AUDIO; an unknown name is reported and plays nothing """
+    name = os.environ.get('TICKBAR_AUDIO', 'pygame')
+    backend = AUDIO_BACKENDS.get(name)
+    if backend is None:
+        print(f"Audio error: unknown TICKBAR_AUDIO {name!r}, expected one of {', '.join(AUDIO_BACKENDS)}; "
+              f"running without sound")
+        backend = NullAudioBackend
+    return backend()
+
+def duration_range(backend):
+    """ The cycle durations a window bar takes with backend; only the streaming mixer keeps sub-second ones exact """
+    return (0.1 if backend is not None and backend.streaming else 1.0), 10.0
+
+class SoundBank:
+    """ Pre-decoded sounds played round-robin on reserved channels, so overlapping ticks are never dropped """
+    def __init__(self, backend, channel_count=4):
+        self.backend = backend
+        self.channel_count = channel_count
+        self.sounds = {}
+        self.channels = []
+        self.next_channel = 0
+        self.stats = None
+        self.pending_schedules = {}
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+
+    def preload(self, sound_files):
+        thread = threading.Thread(target=self.load, args=(sound_files,), name="tickbar-audio", daemon=True)
+        thread.start()
+        return thread
+
+    def load(self, sound_files):
+        try:
+            self.backend.open()
+            sounds = {name: self.backend.decode(path) for name, path in sound_files.items()}
+            self.channels = self.backend.reserve_channels(self.channel_count)
+            self.sounds = sounds
+        except Exception as e:
+            print(f"Sound error: {e}")
+            self.backend = NullAudioBackend()
+            self.channels = self.backend.reserve_channels(self.channel_count)
+        self.ready.set()
+        with self.lock:
+            keys = list(self.pending_schedules)
+        for key in keys:
+            self.apply_schedule(key)
+
+    def add_sounds(self, sound_files):
+        """ Decode more sounds once the backend is open, without blocking the caller """
+        def load_more():
+            self.ready.wait()
+            sounds = {}
+            for name, path in sound_files.items():
+                try:
+                    sounds[name] = self.backend.decode(path)
+                except Exception as e:
+                    print(f"Sound error: {e}")
+            self.sounds = {**self.sounds, **sounds}
+        thread = threading.Thread(target=load_more, name="tickbar-audio", daemon=True)
+        thread.start()
+        return thread
+
+    def pick_channel(self):
+        # Prefer an idle channel; when all are busy, cut the one started longest ago.
+        count = len(self.channels)
+        for offset in range(count):
+            index = (self.next_channel + offset) % count
+            if not self.backend.channel_busy(self.channels[index]):
+                break
+        else:
+            index = self.next_channel
+        self.next_channel = (index + 1) % count
+        return self.channels[index]
+
+    def play(self, name):
+        requested_at = time.perf_counter()
+        if not self.ready.is_set():
+            return False
+        sound = self.sounds.get(name)
+        if sound is None:
+            return False
+        with self.lock:
+            channel = self.pick_channel()
+            self.backend.play(sound, channel, requested_at)
+        stats = self.stats
+        if stats is not None:
+            stats.record('audio_start_latency', time.perf_counter() - requested_at)
+        return True
+
+    def schedule(self, key, name, start_time, duration, first_tick):
+        """ Let a streaming backend place boundary ticks itself; False means play them one by one """
+        if not self.backend.streaming:
+            return False
+        with self.lock:
+            self.pending_schedules[key] = (name, start_time, duration, first_tick)
+        if self.ready.is_set():
+            self.apply_schedule(key)
+        return True
+
+    def unschedule(self, key):
+        with self.lock:
+            self.pending_schedules.pop(key, None)
+        if self.ready.is_set():
+            self.backend.clear_ticks(key)
+
+    def apply_schedule(self, key):
+        with self.lock:
+            pending = self.pending_schedules.get(key)
+        if pending is None:
+            return
+        name, start_time, duration, first_tick = pending
+        sound = self.sounds.get(name)
+        if sound is not None:
+            self.backend.schedule_ticks(key, sound, start_time, duration, first_tick)
+
+    def note_boundary(self, key, tick, fired_at):
+        if self.ready.is_set():
+            self.backend.note_boundary(key, tick, fired_at)
+
+    def gap_stats(self):
+        return self.backend.gap_stats()
+
+    def close(self):
+        if self.ready.is_set():
+            self.backend.close()
+
 class CustomDialog:
-    def __init__(self, parent, title="Set Timer", initialvalue="6.0"):
+    """ Built once per bar; ask() shows it again and hiding it is a withdraw, not a teardown """
+    def __init__(self, parent, title="Set Timer"):
+        self.parent = parent
         self.top = tk.Toplevel(parent)
+        self.top.withdraw()
         self.top.configure(bg='#222222')
         self.top.resizable(False, False)
         self.top.overrideredirect(True)
         self.top.attributes('-topmost', True)
         self.top.transient(parent)
 
-        self.top.geometry('200x100')
-        self.top.update_idletasks()
-        x = parent.winfo_x()
-        y = parent.winfo_y() + parent.winfo_height()
-        self.top.geometry(f'200x100+{x}+{y}')
-
         frame = tk.Frame(self.top, bg='#222222', bd=2, relief='ridge')
         frame.pack(fill='both', expand=True, padx=5, pady=5)
 
@@ -39,7 +978,6 @@ class CustomDialog:
         self.entry = tk.Entry(frame, bg='#333333', fg='#FFFFFF', insertbackground='#4CAF50',
                               font=('Arial', 10), justify='center', width=10)
         self.entry.pack(pady=(2, 5))
-        self.entry.insert(0, initialvalue)
 
         button_frame = tk.Frame(frame, bg='#222222')
         button_frame.pack()
@@ -53,34 +991,55 @@ class CustomDialog:
                   font=('Arial', 10)).pack(side=tk.LEFT, padx=3)
 
         self.result = None
+        self.done = tk.BooleanVar(self.top, value=True)
 
-        def set_focus_and_grab():
-            try:
-                self.top.deiconify()
-                self.top.lift()
-                self.top.focus_force()
-                self.top.grab_set_global()
-                self.entry.focus_force()
-                self.entry.select_range(0, tk.END)
-                self.entry.icursor(tk.END)
-
-            except tk.TclError:
-                try:
-                    self.top.grab_set()
-                    self.entry.focus_set()
-                    self.entry.select_range(0, tk.END)
-
-                except tk.TclError:...
-
-
-        self.top.after(50, set_focus_and_grab)
-        self.top.after(150, set_focus_and_grab)
+        # Focus is taken once the window is actually mapped, instead of retrying on timers.
+        self.top.bind("<Map>", self.on_map)
+        self.top.bind("<Destroy>", self.on_destroy)
         self.top.bind("<Return>", lambda event: self.on_ok())
         self.top.bind("<Escape>", lambda event: self.on_cancel())
         self.top.bind("<FocusIn>", lambda event: print("Dialog window gained focus"))
         self.entry.bind("<FocusIn>", lambda event: print("Entry gained focus"))
 
-        parent.wait_window(self.top)
+    def ask(self, initialvalue="6.0"):
+        self.result = None
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, initialvalue)
+        x = self.parent.winfo_x()
+        y = self.parent.winfo_y() + self.parent.winfo_height()
+        self.top.geometry(f'200x100+{x}+{y}')
+        self.done.set(False)
+        self.top.deiconify()
+        self.top.wait_variable(self.done)
+        return self.result
+
+    def on_map(self, event):
+        if event.widget is not self.top:
+            return
+        try:
+            self.top.lift()
+            self.top.focus_force()
+            self.top.grab_set_global()
+            self.entry.focus_force()
+            self.entry.select_range(0, tk.END)
+            self.entry.icursor(tk.END)
+
+        except tk.TclError:
+            try:
+                self.top.grab_set()
+                self.entry.focus_set()
+                self.entry.select_range(0, tk.END)
+
+            except tk.TclError:...
+
+    def on_destroy(self, event):
+        if event.widget is self.top and not self.done.get():
+            self.done.set(True)
+
+    def close(self):
+        self.top.grab_release()
+        self.top.withdraw()
+        self.done.set(True)
 
     def on_ok(self):
         try:
@@ -88,32 +1047,775 @@ class CustomDialog:
         except ValueError:
             self.result = None
             print("Invalid value entered")
-        self.top.destroy()
+        self.close()
 
     def on_cancel(self):
         self.result = None
-        self.top.destroy()
+        self.close()
+
+class TtkBarRenderer:
+    """ The themed ttk.Progressbar; each colour is a style registered once, so a colour change is a switch by name """
+    def __init__(self, parent, style, color_styles, color='#4CAF50', base_style='green.Horizontal.TProgressbar'):
+        self.style = style
+        self.color_styles = color_styles
+        self.base_style = base_style
+        self.color = color
+        self.value = None
+        self.widget = ttk.Progressbar(parent, mode='determinate', maximum=100,
+                                      style=self.color_value(color), orient='horizontal')
+
+    def color_value(self, color):
+        # Reconfiguring a style restyles every widget using it; registering one per colour never does.
+        name = self.color_styles.get(color)
+        if name is None:
+            name = self.color_styles[color] = f'c{len(self.color_styles)}.{self.base_style}'
+            self.style.configure(name, background=color)
+        return name
+
+    def prepare_colors(self, colors):
+        for color in colors:
+            self.color_value(color)
+
+    def set_value(self, value):
+        if value != self.value:
+            self.value = value
+            self.widget['value'] = value
+
+    def invalidate(self):
+        self.value = None
+        self.color = None
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self.widget.configure(style=self.color_value(color))
+
+class CanvasBarRenderer:
+    """ Trough, fill and border as canvas items; a value change only moves the fill's right edge """
+    def __init__(self, parent, color='#4CAF50', trough='#222222', border='#777777', border_width=1):
+        self.color = color
+        self.border_width = border_width
+        self.value = 0
+        self.fill_px = None
+        self.width = 1
+        self.height = 1
+        self.widget = tk.Canvas(parent, bg=trough, highlightthickness=0, bd=0)
+        self.fill_item = self.widget.create_rectangle(0, 0, 0, 0, fill=color, width=0)
+        self.border_item = self.widget.create_rectangle(0, 0, 0, 0, outline=border, width=border_width)
+        self.widget.bind('<Configure>', self.on_configure)
+
+    def on_configure(self, event):
+        self.width, self.height = event.width, event.height
+        half = self.border_width / 2
+        self.widget.coords(self.border_item, half, half, self.width - half, self.height - half)
+        self.fill_px = None
+        self.set_value(self.value)
+
+    def set_value(self, value):
+        self.value = value
+        inner = max(0, self.width - 2 * self.border_width)
+        fill_px = int(inner * min(max(value, 0), 100) / 100)
+        if fill_px != self.fill_px:
+            self.fill_px = fill_px
+            bw = self.border_width
+            self.widget.coords(self.fill_item, bw, bw, bw + fill_px, self.height - bw)
+
+    def color_value(self, color):
+        return color
+
+    def prepare_colors(self, colors):
+        pass
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self.widget.itemconfigure(self.fill_item, fill=color)
+
+    def invalidate(self):
+        self.fill_px = None
+        self.color = None
+
+RENDERERS = ('ttk', 'canvas')
+
+URGENCY_STEPS = 50
+
+def mix_color(a, b, t):
+    channels = [round(int(a[i:i + 2], 16) * (1 - t) + int(b[i:i + 2], 16) * t) for i in (1, 3, 5)]
+    return '#{:02X}{:02X}{:02X}'.format(*channels)
+
+def build_urgency_lut(color, steps=URGENCY_STEPS, start=0.8, amber='#FFC107', red='#F44336'):
+    """ One colour per progress bucket: the segment's own colour, then amber and red over the last 20% """
+    if not (isinstance(color, str) and len(color) == 7 and color.startswith('#')):
+        return [color] * steps
+    lut = []
+    for bucket in range(steps):
+        t = (bucket / (steps - 1) - start) / (1 - start)
+        if t <= 0:
+            lut.append(color)
+        elif t < 0.5:
+            lut.append(mix_color(color, amber, t * 2))
+        else:
+            lut.append(mix_color(amber, red, t * 2 - 1))
+    return lut
+
+TCL_ANIMATION = r'''
+namespace eval ::tickbar {}
+proc ::tickbar::frame {id} {
+    upvar #0 ::tickbar::bar$id bar
+    set bar(after) ""
+    set now [expr {[clock microseconds] / 1e6 - $bar(start)}]
+    set cycle [expr {int(floor($now / $bar(total)))}]
+    if {$cycle >= 1 && !$bar(repeat)} {
+        {*}$bar(command) end
+        return
+    }
+    set offset [expr {$now - $cycle * $bar(total)}]
+    set index [expr {max(0, [lsearch -sorted -real -bisect $bar(offsets) $offset])}]
+    set duration [lindex $bar(durations) $index]
+    set into [expr {$offset - [lindex $bar(offsets) $index]}]
+    set until [expr {$duration - $into}]
+    set tick [expr {$cycle * $bar(count) + $index}]
+    if {$tick != $bar(tick)} {
+        set bar(tick) $tick
+        {*}$bar(command) $tick $index
+    }
+    if {$bar(visible)} {
+        set width [expr {max(1, $bar(width))}]
+        set px [expr {int($into / $duration * $width)}]
+        if {$bar(luts) ne ""} {
+            set bucket "$index,[expr {min($bar(steps) - 1, int($into / $duration * $bar(steps)))}]"
+            if {$bucket ne $bar(bucket)} {
+                set bar(bucket) $bucket
+                set value [lindex $bar(luts) {*}[split $bucket ,]]
+                if {$value ne $bar(color)} {
+                    set bar(color) $value
+                    if {$bar(kind) eq "canvas"} {
+                        $bar(widget) itemconfigure $bar(item) -fill $value
+                    } else {
+                        $bar(widget) configure -style $value
+                    }
+                }
+            }
+        }
+        if {$px != $bar(px)} {
+            set bar(px) $px
+            if {$bar(kind) eq "canvas"} {
+                set bw $bar(bw)
+                set fill [expr {int(max(0, [winfo width $bar(widget)] - 2 * $bw) * $px / double($width))}]
+                $bar(widget) coords $bar(item) $bw $bw [expr {$bw + $fill}] [expr {[winfo height $bar(widget)] - $bw}]
+            } else {
+                $bar(widget) configure -value [expr {$px * 100.0 / $width}]
+            }
+        }
+        set step [expr {$duration / $width}]
+        set delay [expr {min($step - fmod($into, $step), $until)}]
+        if {$bar(textcanvas) ne ""} {
+            set seconds [expr {int(ceil($until))}]
+            if {$seconds >= 60} {
+                set label [format "%d:%02d #%d" [expr {$seconds / 60}] [expr {$seconds % 60}] [expr {$cycle + 1}]]
+            } else {
+                set label [format "%ds #%d" $seconds [expr {$cycle + 1}]]
+            }
+            if {$label ne $bar(label)} {
+                set bar(label) $label
+                $bar(textcanvas) itemconfigure $bar(textitem) -text $label
+            }
+            set delay [expr {min($delay, $until - ceil($until) + 1)}]
+        }
+    } else {
+        set delay [expr {min($bar(idle), $until)}]
+    }
+    set bar(after) [after [expr {max($bar(min), int(ceil($delay * 1000)))}] [list ::tickbar::frame $id]]
+}
+proc ::tickbar::stop {id} {
+    upvar #0 ::tickbar::bar$id bar
+    if {[info exists bar(after)] && $bar(after) ne ""} {
+        after cancel $bar(after)
+        set bar(after) ""
+    }
+}
+'''
+
+class TclAnimation:
+    """ Runs the steady-state fill as a Tcl proc on `clock microseconds`; Python only hears about segment starts.
+
+    That clock is the wall clock, which NTP can step or slew, so the proc's start is re-anchored on perf_counter
+    at every segment start and any error is confined to one segment.
+    """
+    def __init__(self, bar):
+        self.bar = bar
+        self.tk = bar.root.tk
+        if not self.tk.call('info', 'procs', '::tickbar::frame'):
+            self.tk.eval(TCL_ANIMATION)
+        self.var = f'::tickbar::bar{bar.index}'
+        # Registered once; the proc reschedules itself with a plain script, so frames create no commands.
+        self.command = bar.root.register(bar.on_tcl_boundary)
+        self.running = False
+
+    def start(self):
+        bar = self.bar
+        program = bar.program
+        renderer = bar.renderer
+        countdown = bar.countdown
+        canvas = isinstance(renderer, CanvasBarRenderer)
+        self.tk.call('array', 'set', self.var, (
+            'start', self.tcl_start(),
+            'total', program.total, 'repeat', int(program.repeat), 'count', program.count,
+            'offsets', tuple(program.offsets), 'durations', tuple(program.durations),
+            'width', bar.bar_width, 'visible', int(bar.window_visible),
+            'idle', bar.idle_interval / 1000, 'min', bar.update_interval,
+            'tick', -1, 'px', -1, 'label', '', 'bucket', '', 'color', '', 'steps', URGENCY_STEPS,
+            'luts', tuple(tuple(renderer.color_value(color) for color in lut) for lut in bar.urgency_luts or ()),
+            'kind', 'canvas' if canvas else 'ttk', 'widget', str(renderer.widget),
+            'item', renderer.fill_item if canvas else '', 'bw', renderer.border_width if canvas else 0,
+            'textcanvas', str(countdown.canvas) if countdown is not None else '',
+            'textitem', countdown.item if countdown is not None else '',
+            'command', self.command, 'after', ''))
+        self.running = True
+        self.tk.call('::tickbar::frame', bar.index)
+
+    def tcl_start(self):
+        """ The bar's start_time on Tcl's clock, as of now """
+        tcl_now = int(self.tk.call('clock', 'microseconds')) / 1e6
+        return tcl_now - (self.bar.clock.now() - self.bar.start_time)
+
+    def anchor(self):
+        if self.running:
+            self.tk.call('set', f'{self.var}(start)', self.tcl_start())
+
+    def resume(self):
+        # The proc stops rescheduling itself once it decides a one-shot program is over.
+        if self.running:
+            self.anchor()
+            self.tk.call('::tickbar::frame', self.bar.index)
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.tk.call('::tickbar::stop', self.bar.index)
+        # Tcl drew behind the renderer's and overlay's backs, so their change gates must not trust their caches.
+        self.bar.renderer.invalidate()
+        if self.bar.countdown is not None:
+            self.bar.countdown.invalidate()
+
+ANIMATIONS = ('python', 'tcl')
+
+ZONE_CURSORS = {
+    '': '', 'n': 'top_side', 's': 'bottom_side', 'w': 'left_side', 'e': 'right_side',
+    'nw': 'top_left_corner', 'ne': 'top_right_corner', 'sw': 'bottom_left_corner', 'se': 'bottom_right_corner',
+}
+
+def default_control_path():
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'tickbar.sock')
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(tempfile.gettempdir(), f'tickbar-{user}.sock')
+
+def default_sync_path():
+    return default_control_path()[:-len('.sock')] + '.sync'
+
+class MappedRecord:
+    """ A fixed-layout struct in a memory-mapped file, led by a sequence counter that is odd mid-write """
+    SEQUENCE = struct.Struct('<Q')
+    LAYOUT = SEQUENCE
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < self.LAYOUT.size:
+                os.ftruncate(fd, self.LAYOUT.size)
+            self.map = mmap.mmap(fd, self.LAYOUT.size)
+        finally:
+            os.close(fd)
+        # A writer that died mid-write leaves an odd count; carry on from the next even one.
+        self.sequence = (self.current_sequence() + 1) & ~1
+
+    def current_sequence(self):
+        # Plain memory reads: checking for a change is one 8-byte unpack and no system call.
+        return self.SEQUENCE.unpack_from(self.map)[0]
+
+    def write(self, *fields):
+        # Stores into the page cache only; the kernel writes them back, so a crash loses nothing and nobody waits.
+        self.SEQUENCE.pack_into(self.map, 0, self.sequence + 1)
+        self.LAYOUT.pack_into(self.map, 0, self.sequence + 1, *fields)
+        self.sequence += 2
+        self.SEQUENCE.pack_into(self.map, 0, self.sequence)
+
+    def read(self):
+        """ (sequence, fields) of the last complete write, or None if there is none or it is being written """
+        sequence = self.current_sequence()
+        if sequence == 0 or sequence & 1:
+            return None
+        fields = self.LAYOUT.unpack_from(self.map)[1:]
+        if self.current_sequence() != sequence:
+            return None
+        return sequence, fields
+
+    def close(self):
+        self.map.close()
+
+class PhaseSync(MappedRecord):
+    """ Epoch, program and run state shared between processes; one publishes, the rest follow """
+    # sequence, epoch, duration, running, publisher pid, segment count, program path
+    LAYOUT = struct.Struct('<QddIII256s')
+    SYNC_ROLES = ('publish', 'follow')
+
+    def __init__(self, path, publisher):
+        super().__init__(path)
+        self.publisher = publisher
+        self.seen = None
+
+    def publish(self, epoch, program, running):
+        # A program file is shared by path; a segment count without one tells followers it can't be rebuilt.
+        path = (program.path or '').encode('utf-8')
+        if len(path) > 256:
+            path = b''
+        self.write(epoch, program.total, int(running), os.getpid(), program.count, path)
+
+    def read_changed(self):
+        """ (epoch, duration, running, segment count, program path) when the publisher changed something
+        since the last call, else None """
+        if self.current_sequence() == self.seen:
+            return None
+        record = self.read()
+        if record is None:
+            return None
+        self.seen, (epoch, duration, running, _, count, path) = record
+        return epoch, duration, bool(running), count, path.rstrip(b'\0').decode('utf-8', 'replace')
+
+class BarState(MappedRecord):
+    """ A bar's phase, duration, sound setting and position, saved as a few stores and read back on start """
+    # sequence, version, epoch (wall clock), duration, running, sound, x, y, width, height, program path
+    LAYOUT = struct.Struct('<QIddBBiiii256s')
+    VERSION = 1
+
+    def __init__(self, path):
+        # The record has a single writer: a second instance with the same state file is refused, not merged.
+        self.lock_fd = None
+        if platform.system() != "Windows":
+            import fcntl
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.lock_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self.lock_fd)
+                raise OSError(errno.EBUSY, f"{path} is in use by another tickbar")
+        super().__init__(path)
+
+    def close(self):
+        super().close()
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+
+    def load(self):
+        record = self.read()
+        if record is None:
+            return None
+        version, epoch, duration, running, sound, x, y, width, height, program = record[1]
+        if version != self.VERSION:
+            return None
+        return {'epoch': epoch, 'duration': duration, 'running': bool(running), 'sound': bool(sound),
+                'geometry': (x, y, width, height), 'program': program.rstrip(b'\0').decode('utf-8', 'replace')}
+
+    def save(self, epoch, duration, running, sound, geometry, program=None):
+        # perf_counter doesn't survive a reboot, so the epoch is kept on the wall clock.
+        program = (program or '').encode('utf-8')
+        if len(program) > 256:
+            program = b''
+        self.write(self.VERSION, epoch, duration, int(running), int(sound), *geometry, program)
+
+class ControlServer:
+    """ Line protocol on a Unix socket, serviced from the Tk loop through file handlers.
+
+    Requests are one line each, optionally prefixed with @N to address a single bar:
+    ping, status, start, stop, toggle, phase [offset], duration <seconds>, program <path>, subscribe.
+    Replies are one line starting with ok or err; subscribers also receive
+    "tick <bar> <number> <deadline>" as each cycle boundary fires.
+
+    Only the Tk thread touches client sockets. Boundaries arrive on the timing thread and are
+    queued, with a byte on a socket pair to wake the Tk loop; each client has an outbound
+    buffer that is flushed as the socket becomes writable.
+    """
+    max_backlog = 65536
+
+    def __init__(self, host, path):
+        load_tk()
+        self.host = host
+        self.path = path
+        self.clients = {}
+        self.outgoing = {}
+        self.subscribers = set()
+        self.events = queue.Queue()
+        self.claim_path(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(8)
+        self.sock.setblocking(False)
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.wake_reader.setblocking(False)
+        self.wake_writer.setblocking(False)
+        self.tk = host.root.tk
+        self.tk.createfilehandler(self.sock, tk.READABLE, self.on_accept)
+        self.tk.createfilehandler(self.wake_reader, tk.READABLE, self.on_wake)
+        # The list is replaced, never changed in place: the timing thread may be iterating the old one.
+        host.boundary_listeners = host.boundary_listeners + [self.publish_boundary]
+
+    @staticmethod
+    def claim_path(path):
+        # A socket file left by a crashed instance refuses connections; a live one answers and is left alone.
+        if not os.path.exists(path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, f"another tickbar is serving {path}")
 
-class HUDApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.overrideredirect(True)
-        self.root.attributes('-topmost', True)
-        self.default_width = 226
-        self.default_height = 26
-        self.min_width = self.default_width
-        self.min_height = self.default_height
-        self.max_width = self.default_width * 2
-        self.max_height = self.default_height * 2
+    def on_accept(self, sock, mask):
+        try:
+            client, _ = self.sock.accept()
+        except BlockingIOError:
+            return
+        client.setblocking(False)
+        self.clients[client] = b''
+        self.outgoing[client] = bytearray()
+        self.tk.createfilehandler(client, tk.READABLE, self.on_client)
+
+    def on_client(self, client, mask):
+        if mask & tk.WRITABLE:
+            self.flush(client)
+        if mask & tk.READABLE and client in self.clients:
+            self.on_readable(client)
+
+    def on_readable(self, client):
+        try:
+            data = client.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.drop(client)
+            return
+        buffer = self.clients[client] + data
+        *lines, self.clients[client] = buffer.split(b'\n')
+        for line in lines:
+            reply = self.handle(client, line.decode('utf-8', 'replace').split())
+            if reply is not None and not self.send(client, reply):
+                return
+
+    def handle(self, client, words):
+        bars = self.host.bars
+        if words and words[0].startswith('@'):
+            # @N names a bar by its index, which outlives closing the bars before it.
+            try:
+                index = int(words[0][1:])
+            except ValueError:
+                index = None
+            bars = [bar for bar in self.host.bars if bar.index == index]
+            if not bars:
+                return f"err no such bar {words[0]}"
+            words = words[1:]
+        if not words:
+            return None
+        command, args = words[0].lower(), words[1:]
+        try:
+            if command == 'ping':
+                return "ok pong"
+            elif command == 'status':
+                return "ok " + " ".join(self.describe(bar) for bar in bars)
+            elif command == 'start':
+                for bar in bars:
+                    bar.start()
+            elif command == 'stop':
+                for bar in bars:
+                    bar.stop()
+            elif command == 'toggle':
+                for bar in bars:
+                    if bar.is_running:
+                        bar.stop()
+                    else:
+                        bar.start()
+            elif command == 'phase':
+                offset = float(args[0]) if args else 0.0
+                for bar in bars:
+                    bar.rephase(offset)
+            elif command == 'duration':
+                duration = float(args[0])
+                if not all(bar.set_duration(duration) for bar in bars):
+                    return f"err duration out of range: {duration}"
+            elif command == 'program':
+                path = ' '.join(args)
+                if not path or not all(bar.load_program(path) for bar in bars):
+                    return f"err cannot load program: {path}"
+            elif command == 'subscribe':
+                self.subscribers.add(client)
+            else:
+                return f"err unknown command: {command}"
+        except (ValueError, IndexError):
+            return f"err bad arguments for {command}"
+        return "ok"
+
+    def describe(self, bar):
+        phase = (bar.clock.now() - bar.start_time) % bar.progress_duration if bar.is_running else 0.0
+        state = 'running' if bar.is_running else 'stopped'
+        return f"{bar.index},{state},{bar.progress_duration:g},{phase:.4f},{bar.last_tick_number}"
+
+    def send(self, client, line):
+        """ Queue a line for a client and write what the socket takes now; False if the client was dropped """
+        outgoing = self.outgoing[client]
+        was_empty = not outgoing
+        outgoing += line.encode('utf-8') + b'\n'
+        if len(outgoing) > self.max_backlog:
+            # A client that cannot keep up is dropped rather than buffered without bound.
+            self.drop(client)
+            return False
+        if was_empty:
+            return self.flush(client)
+        return True
+
+    def flush(self, client):
+        outgoing = self.outgoing[client]
+        try:
+            sent = client.send(outgoing)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self.drop(client)
+            return False
+        del outgoing[:sent]
+        # Watch for writability only while something is left to write.
+        mask = tk.READABLE | tk.WRITABLE if outgoing else tk.READABLE
+        self.tk.createfilehandler(client, mask, self.on_client)
+        return True
+
+    def publish_boundary(self, bar, tick_number, deadline, fired_at):
+        # Timing thread: queue the line and wake the Tk loop; sockets are only written from there.
+        if not self.subscribers:
+            return
+        self.events.put(f"tick {bar.index} {tick_number} {deadline:.6f}")
+        try:
+            self.wake_writer.send(b'\0')
+        except BlockingIOError:
+            # Wakes are already pending; the Tk side drains the whole queue on each one.
+            pass
 
-        mon_x, mon_y, mon_width, mon_height = self.get_primary_monitor_geometry()
-        x = mon_x + (mon_width - self.default_width) // 2
-        y = mon_y + (mon_height - self.default_height) // 2
-        self.base_x = x
-        self.base_y = y
-        self.root.geometry(f'{self.default_width}x{self.default_height}+{x}+{y}')
-        self.root.configure(bg='#222222')
-        self.sound_enabled_var = tk.BooleanVar(value=True)
+    def on_wake(self, sock, mask):
+        try:
+            while self.wake_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                line = self.events.get_nowait()
+            except queue.Empty:
+                return
+            for client in list(self.subscribers):
+                self.send(client, line)
+
+    def drop(self, client):
+        if client not in self.clients:
+            return
+        self.subscribers.discard(client)
+        del self.clients[client]
+        del self.outgoing[client]
+        self.tk.deletefilehandler(client)
+        client.close()
+
+    def close(self):
+        self.host.boundary_listeners = [other for other in self.host.boundary_listeners
+                                        if other != self.publish_boundary]
+        for client in list(self.clients):
+            self.drop(client)
+        self.tk.deletefilehandler(self.sock)
+        self.tk.deletefilehandler(self.wake_reader)
+        self.sock.close()
+        self.wake_reader.close()
+        self.wake_writer.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+class ControlClient:
+    """ Minimal client for the control socket, used by --send and by scripts """
+    def __init__(self, path=None, timeout=2.0):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_control_path())
+        self.file = self.sock.makefile('rb')
+
+    def request(self, line):
+        self.sock.sendall(line.encode('utf-8') + b'\n')
+        return self.readline()
+
+    def readline(self):
+        return self.file.readline().decode('utf-8').rstrip('\n')
+
+    def events(self):
+        self.sock.settimeout(None)
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+class StatsOverlay:
+    """ Small borderless window under a bar with its live hot-path numbers """
+    def __init__(self, bar, interval=500):
+        self.bar = bar
+        self.interval = interval
+        self.window = tk.Toplevel(bar.root)
+        self.window.overrideredirect(True)
+        self.window.attributes('-topmost', True)
+        self.label = tk.Label(self.window, bg='#222222', fg='#FFFFFF', font=('Courier', 8),
+                              justify='left', anchor='w', padx=4, pady=2)
+        self.label.pack(fill='both')
+        self.entry = None
+        self.refresh()
+
+    def refresh(self):
+        bar = self.bar
+        stats = bar.host.stats
+        keys = bar.metric_keys
+        lines = [
+            stats.line('frame', keys['frame_interval']),
+            stats.line('cb', keys['animate_progress']),
+            stats.line('tick', keys['tick_lateness']),
+            stats.line('audio', 'audio_start_latency'),
+        ]
+        self.label.configure(text='\n'.join(lines))
+        self.window.geometry(f'+{bar.win_x}+{bar.win_y + bar.win_h}')
+        self.entry = bar.scheduler.call_later(self.interval, self.refresh)
+
+    def close(self):
+        self.bar.scheduler.cancel(self.entry)
+        self.window.destroy()
+
+def format_countdown(seconds, cycle):
+    seconds = int(seconds)
+    left = f"{seconds // 60}:{seconds % 60:02d}" if seconds >= 60 else f"{seconds}s"
+    return f"{left} #{cycle + 1}"
+
+class CountdownOverlay:
+    """ Time left in the segment and the cycle count, drawn by one persistent canvas text item """
+    def __init__(self, bar):
+        self.bar = bar
+        self.font = tkfont.Font(root=bar.root, family='Arial', size=-10, weight='bold')
+        self.badge = not isinstance(bar.renderer, CanvasBarRenderer)
+        if self.badge:
+            # A themed progressbar can't carry text, so a small canvas sits inside its right end.
+            self.canvas = tk.Canvas(bar.root, bg='#222222', highlightthickness=0, bd=0)
+            handlers = {'<Button-1>': bar.start_potential_action, '<ButtonRelease-1>': bar.toggle_progress,
+                        '<B1-Motion>': bar.on_motion, '<Button-3>': bar.show_menu, '<Motion>': bar.update_cursor}
+            for sequence, handler in handlers.items():
+                self.canvas.bind(sequence, lambda e, handler=handler: self.forward(e, handler))
+        else:
+            self.canvas = bar.renderer.widget
+        self.item = self.canvas.create_text(0, 0, text='', fill='#FFFFFF', font=self.font, anchor='e')
+        self.origin = (0, 0)
+        self.size = None
+        self.shown = None
+        self.fit(bar.program)
+        self.layout(bar.progress.winfo_width(), bar.progress.winfo_height())
+
+    def forward(self, event, handler):
+        # Pointer events on the badge belong to the bar, in the bar's coordinates.
+        event.x += self.origin[0]
+        event.y += self.origin[1]
+        return handler(event)
+
+    def fit(self, program, cycles=100):
+        """ Size the badge for the widest text program shows in its first cycles cycles """
+        self.cycles = cycles
+        self.widest = format_countdown(math.ceil(max(program.durations)), cycles - 1 if program.repeat else 0)
+        if self.size is not None:
+            size, self.size = self.size, None
+            self.layout(*size)
+
+    def layout(self, width, height):
+        # Font size and text extent are worked out here, once per resize or program, never per frame.
+        if width <= 1 or (width, height) == self.size:
+            return
+        self.size = (width, height)
+        self.font.configure(size=-max(8, height * 9 // 20))
+        pad = 4
+        if self.badge:
+            margin = self.bar.resize_margin + 1
+            badge_width = self.font.measure(self.widest) + 2 * pad
+            badge_height = max(1, height - 2 * margin)
+            self.origin = (max(margin, width - margin - badge_width), margin)
+            self.canvas.coords(self.item, badge_width - pad, badge_height // 2)
+            self.canvas.place(x=self.origin[0], y=margin, width=badge_width, height=badge_height)
+        else:
+            self.canvas.coords(self.item, width - pad - 1, height // 2)
+
+    def update(self, seconds_left, cycle):
+        shown = (math.ceil(seconds_left), cycle)
+        if shown != self.shown:
+            self.shown = shown
+            if cycle >= self.cycles:
+                # One more cycle digit: widen the badge once per tenfold, not per frame.
+                self.fit(self.bar.program, self.cycles * 10)
+            self.canvas.itemconfigure(self.item, text=format_countdown(*shown))
+
+    def invalidate(self):
+        self.shown = ()
+
+    def clear(self):
+        if self.shown is not None:
+            self.shown = None
+            self.canvas.itemconfigure(self.item, text='')
+
+    def close(self):
+        if self.badge:
+            self.canvas.destroy()
+        else:
+            self.canvas.delete(self.item)
+
+BAR_METRICS = ('frame_interval', 'animate_progress', 'wave_animation', 'handle_drag', 'handle_resize',
+               'play_tick_sound', 'tick_lateness')
+
+def send_command(command, path=None):
+    client = ControlClient(path)
+    try:
+        print(client.request(command))
+        if command.split()[-1:] == ['subscribe']:
+            for line in client.events():
+                print(line, flush=True)
+    finally:
+        client.close()
+
+class BarHost:
+    """ Everything the bars in one process share: scheduler, timing thread, audio, style and monitor """
+    def __init__(self, root, audio_backend=None, fast_start=False, timings=False, startup=None, clock=None):
+        load_tk()
+        self.root = root
+        self.clock = clock or RealClock(root)
+        self.fast_start = fast_start
+        self.print_startup = fast_start or timings
+        self.startup = startup or STARTUP
+        self.bars = []
+        self.bar_counter = itertools.count()
+        self.boundary_listeners = []
+        self.control = None
+        self.stats = None
+        self.bar_gap = 8
 
         if platform.system() == "Linux":
             try:
@@ -127,27 +1829,684 @@ class HUDApp:
             except Exception as e:
                 print(f"Windows DPI error: {e}")
 
+        # Probed on first use; bars restoring a saved position never need it.
+        self.monitor = None
+
+        self.scheduler = FrameScheduler(self.clock)
+        self.timing = TimingEngine(clock=self.clock)
+        if audio_backend is None:
+            audio_backend = env_audio_backend()
+        self.sound_bank = SoundBank(audio_backend)
+        self.sound_files = {'tick': resource_path('tick.wav')}
+        self.audio_started = False
+        if not fast_start:
+            self.preload_audio()
+
         self.style = ttk.Style()
         self.style.theme_use('clam')
+        self.color_styles = {}
+        self.urgency_cache = {}
         self.style.configure('green.Horizontal.TProgressbar', troughcolor='#222222', background='#4CAF50',
                             bordercolor='#777777', borderwidth=1)
-        self.progress = ttk.Progressbar(root, mode='determinate', maximum=100,
-                                        style='green.Horizontal.TProgressbar', orient='horizontal')
+
+        # Bars re-raise themselves on visibility and stacking events; this is only a fallback.
+        self.watchdog_interval = 10000
+        self.clock.after(self.watchdog_interval, self.on_top_watchdog)
+        try:
+            signal.signal(signal.SIGINT, self.signal_handler)
+        except AttributeError:
+            pass
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, self.dump_stats)
+
+    def enable_stats(self):
+        # Collection is off until asked for; every hot path checks a None attribute and moves on.
+        if self.stats is None:
+            self.stats = HotPathStats()
+            self.sound_bank.stats = self.stats
+            for bar in self.bars:
+                bar.stats = self.stats
+        return self.stats
+
+    def stats_report(self):
+        report = {'enabled': self.stats is not None, 'pid': os.getpid(), 'bars': []}
+        for bar in self.bars:
+            report['bars'].append({'index': bar.index, 'running': bar.is_running,
+                                   'duration': bar.progress_duration, 'tick': bar.last_tick_number})
+        if self.stats is not None:
+            report['metrics'] = self.stats.snapshot()
+            report['audio_gap'] = self.sound_bank.gap_stats()
+        return report
+
+    def dump_stats(self, sig=None, frame=None):
+        print(json.dumps(self.stats_report(), indent=2), file=sys.stderr, flush=True)
+
+    def add_bar(self, bar):
+        self.bars.append(bar)
+        return next(self.bar_counter)
+
+    def create_bar(self, **options):
+        return HUDApp(tk.Toplevel(self.root), host=self, **options)
+
+    def bar_position(self, index, width, height):
+        # Bars stack downwards from the centre of the primary monitor.
+        if self.monitor is None:
+            self.monitor = self.get_primary_monitor_geometry()
+            self.startup.mark('geometry probe')
+        mon_x, mon_y, mon_width, mon_height = self.monitor
+        x = mon_x + (mon_width - width) // 2
+        y = mon_y + (mon_height - height) // 2 + index * (height + self.bar_gap)
+        return x, y
+
+    def preload_audio(self):
+        if not self.audio_started:
+            self.audio_started = True
+            self.sound_bank.preload(self.sound_files)
+
+    def urgency_lut(self, color):
+        lut = self.urgency_cache.get(color)
+        if lut is None:
+            lut = self.urgency_cache[color] = build_urgency_lut(color)
+        return lut
+
+    def add_sounds(self, sound_files):
+        missing = {name: path for name, path in sound_files.items() if name not in self.sound_files}
+        if not missing:
+            return
+        # A new dict, since a preload thread may still be iterating the old one.
+        self.sound_files = {**self.sound_files, **missing}
+        if self.audio_started:
+            self.sound_bank.add_sounds(missing)
+
+    def get_primary_monitor_geometry(self):
+        if self.fast_start:
+            cached = load_cached_geometry()
+            if cached is not None:
+                self.verify_cached_geometry(cached)
+                return cached
+        geometry = probe_monitor_geometry()
+        if geometry is not None:
+            save_cached_geometry(geometry)
+            return geometry
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        return 0, 0, screen_width, screen_height
+
+    def verify_cached_geometry(self, cached):
+        # Re-probe off the Tk thread; recentre only if the monitor changed and a bar hasn't moved.
+        result = []
+        thread = threading.Thread(target=lambda: result.append(probe_monitor_geometry()),
+                                  name="tickbar-geometry", daemon=True)
+        thread.start()
+
+        def check():
+            if thread.is_alive():
+                self.root.after(100, check)
+                return
+            geometry = result[0] if result else None
+            if geometry is None or geometry == cached:
+                return
+            save_cached_geometry(geometry)
+            self.monitor = geometry
+            for bar in self.bars:
+                if bar.restored:
+                    continue
+                bar.base_x, bar.base_y = self.bar_position(bar.index, bar.default_width, bar.default_height)
+                bar.move_to_base()
+
+        self.root.after(100, check)
+
+    def start_control_server(self, path):
+        if not hasattr(socket, 'AF_UNIX') or platform.system() == "Windows":
+            print("Control socket is not supported on this platform")
+            return
+        try:
+            self.control = ControlServer(self, path)
+        except OSError as e:
+            print(f"Control socket error: {e}")
+
+    def on_top_watchdog(self):
+        # Windows never reports <Visibility>, so there the watchdog re-asserts topmost unconditionally.
+        force = platform.system() == "Windows"
+        for bar in self.bars:
+            bar.raise_if_obscured(force=force)
+        self.clock.after(self.watchdog_interval, self.on_top_watchdog)
+
+    def remove_bar(self, bar):
+        bar.close()
+        self.bars.remove(bar)
+        if not self.bars:
+            self.quit()
+        elif bar.root is not self.root:
+            bar.root.destroy()
+
+    def signal_handler(self, sig, frame):
+
+        self.quit()
+
+    def shutdown(self):
+        if self.control is not None:
+            self.control.close()
+            self.control = None
+        self.timing.shutdown()
+        self.sound_bank.close()
+        self.root.destroy()
+
+    def quit(self):
+        self.shutdown()
+        sys.exit(0)
+
+class BarCore:
+    """ One bar's cycle, timing, sound and drawing, shared by the window bar and the embeddable widget.
+
+    Subclasses provide the widgets: `renderer`, `progress` and `bar_width` before the first
+    start. Boundary listeners are called on the timing thread as
+    listener(bar, tick_number, deadline, fired_at).
+    """
+    def __init__(self, root, index, clock, scheduler, timing, sound_bank, program, stats=None):
+        self.root = root
+        self.index = index
+        self.clock = clock
+        self.scheduler = scheduler
+        self.timing = timing
+        self.sound_bank = sound_bank
+        self.stats = stats
+        self.metric_keys = {name: f'bar{index}.{name}' for name in BAR_METRICS}
+        self.boundary_listeners = []
+        self.listener_lock = threading.Lock()
+        self.sound_enabled = sound_bank is not None
+        self.ticks_streamed = False
+        self.countdown = None
+        self.urgency_enabled = False
+        self.urgency_luts = None
+        self.color_bucket = -1
+        self.phase_sync = None
+        self.sync_entry = None
+        self.sync_interval = 100
+        self.tcl_animation = None
+        self.resize_margin = 0
+        self.is_running = False
+        self.program = program
+        self.progress_duration = program.total
+        # (program, start time, running) swapped as one reference, so other threads read a consistent phase.
+        self.phase = (program, None, False)
+        self.segment_index = -1
+        self.update_interval = 8
+        self.idle_interval = 500
+        self.frame_after_id = None
+        self.start_time = None
+        self.last_tick_number = -1
+        self.last_fill_px = -1
+        self.window_visible = True
+        self.boundary_events = queue.Queue()
+
+    def add_boundary_listener(self, listener):
+        # The list is replaced, never changed in place: the timing thread may be iterating the old one.
+        with self.listener_lock:
+            self.boundary_listeners = self.boundary_listeners + [listener]
+
+    def remove_boundary_listener(self, listener):
+        with self.listener_lock:
+            self.boundary_listeners = [other for other in self.boundary_listeners if other != listener]
+
+    def state(self):
+        """ Snapshot of the timer; safe to call from any thread """
+        program, start_time, running = self.phase
+        state = {'running': running, 'duration': program.total, 'program': program.name, 'start_time': start_time,
+                 'tick': None, 'cycle': None, 'segment': None, 'label': None, 'remaining': None}
+        if running:
+            elapsed = max(0.0, self.clock.now() - start_time)
+            cycle, index, into = program.locate(elapsed)
+            state['tick'] = program.tick_at(elapsed)
+            state['cycle'] = cycle
+            if index is not None:
+                state.update(segment=index, label=program.labels[index], remaining=program.durations[index] - into)
+        return state
+
+    def add_sounds(self, sound_files):
+        if self.sound_bank is not None and sound_files:
+            self.sound_bank.add_sounds(sound_files)
+
+    def urgency_lut(self, color):
+        return build_urgency_lut(color)
+
+    def check_color(self, color):
+        # Caught when a program is loaded; the frame loop would only find out from a TclError mid-cycle.
+        try:
+            self.root.winfo_rgb(color)
+        except tk.TclError:
+            raise ValueError(f"unknown color: {color}")
+
+    def set_urgency(self, enabled):
+        self.urgency_enabled = enabled
+        self.update_urgency_luts()
+        self.segment_index = -1
+        if self.is_running:
+            self.wake_frame()
+        else:
+            self.renderer.set_color(self.program.colors[0])
+
+    def set_countdown(self, enabled):
+        if enabled:
+            if self.countdown is None:
+                self.countdown = CountdownOverlay(self)
+                self.wake_frame()
+        elif self.countdown is not None:
+            self.countdown.close()
+            self.countdown = None
+            self.wake_frame()
+
+    def close(self):
+        """ Drop every timer and callback the bar has pending; nothing is drawn, as the widgets may be going """
+        self.is_running = False
+        self.phase = (self.program, self.start_time, False)
+        self.timing.stop_timer(self)
+        self.update_tick_schedule()
+        self.cancel_frame()
+        if self.sync_entry is not None:
+            self.scheduler.cancel(self.sync_entry)
+            self.sync_entry = None
+        if self.phase_sync is not None:
+            self.phase_sync.close()
+            self.phase_sync = None
+
+    def set_visible(self, visible):
+        # Hidden bars tick over at the idle rate; showing one redraws it straight away.
+        if visible != self.window_visible:
+            self.window_visible = visible
+            self.wake_frame()
+
+    def play_tick_sound(self, name='tick'):
+        if not self.sound_enabled or name is None:
+            return
+        stats = self.stats
+        if stats is None:
+            self.sound_bank.play(name)
+            return
+        started = time.perf_counter()
+        self.sound_bank.play(name)
+        stats.record(self.metric_keys['play_tick_sound'], time.perf_counter() - started)
+
+    def update_urgency_luts(self):
+        # The gradients and their styles are built here, once per program, never during a frame.
+        if not self.urgency_enabled:
+            self.urgency_luts = None
+            return
+        self.urgency_luts = [self.urgency_lut(color) for color in self.program.colors]
+        for lut in self.urgency_luts:
+            self.renderer.prepare_colors(lut)
+
+    def set_duration(self, duration):
+        min_duration, max_duration = duration_range(self.sound_bank.backend if self.sound_bank is not None else None)
+        if not min_duration <= duration <= max_duration:
+            return False
+        self.set_program(IntervalProgram.fixed(duration))
+        return True
+
+    def set_program(self, program):
+        self.program = program
+        self.progress_duration = program.total
+        self.update_urgency_luts()
+        if self.countdown is not None:
+            self.countdown.fit(program)
+        self.add_sounds(program.sound_files())
+        if self.is_running:
+            now = self.clock.now()
+            # A plain repeating duration stays on its shared grid; a multi-segment program starts from the top.
+            if program.count == 1 and program.repeat:
+                self.restart_cycle(now - now % program.total, join=True)
+            else:
+                self.restart_cycle(now)
+        else:
+            self.phase = (program, self.start_time, False)
+
+    def start(self, start_time=None, join=False):
+        """ Start the cycle at start_time (default now). With join, start_time is an epoch adopted from
+        elsewhere and the first tick waits for its next boundary instead of replaying the one in progress. """
+        if self.is_running:
+            return
+        self.is_running = True
+        self.last_tick_number = -1
+        if self.stats is not None:
+            self.stats.reset_interval(self.metric_keys['frame_interval'])
+        self.restart_cycle(self.clock.now() if start_time is None else start_time, join)
+
+    def resume(self, epoch):
+        """ Carry on a cycle whose epoch was saved on the wall clock, ticking from its next boundary """
+        self.start(epoch - time.time() + self.clock.now(), join=True)
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.phase = (self.program, self.start_time, False)
+        self.timing.stop_timer(self)
+        self.update_tick_schedule()
+        self.cancel_frame()
+        self.renderer.set_value(0)
+        self.segment_index = -1
+        self.renderer.set_color(self.program.colors[0])
+        if self.countdown is not None:
+            self.countdown.clear()
+        self.publish_phase()
+        self.schedule_sync_poll()
+
+    def rephase(self, offset=0.0):
+        # Put the running cycle `offset` seconds in from now, e.g. to line up with a game timer.
+        if self.is_running:
+            self.restart_cycle(self.clock.now() - offset % self.progress_duration, join=True)
+
+    def restart_cycle(self, start_time, join=False):
+        self.start_time = start_time
+        self.phase = (self.program, start_time, True)
+        self.renderer.set_value(0)
+        self.last_fill_px = -1
+        self.segment_index = -1
+        self.cancel_frame()
+        self.publish_phase()
+        self.start_timing(join)
+        self.animate_progress()
+
+    def enable_sync(self, role, path=None):
+        # perf_counter is the system-wide monotonic clock, so an epoch means the same instant in every process.
+        if self.clock.virtual:
+            print("Phase sync needs the real clock")
+            return False
+        try:
+            self.phase_sync = PhaseSync(path or default_sync_path(), publisher=role == 'publish')
+        except (OSError, ValueError) as e:
+            print(f"Phase sync error: {e}")
+            return False
+        if self.phase_sync.publisher:
+            self.publish_phase()
+        else:
+            self.apply_sync()
+            self.schedule_sync_poll()
+        return True
+
+    def publish_phase(self):
+        if self.phase_sync is not None and self.phase_sync.publisher:
+            self.phase_sync.publish(self.start_time or 0.0, self.program, self.is_running)
+
+    def apply_sync(self):
+        """ Follow the publisher's latest state; True if that restarted or stopped the bar """
+        state = self.phase_sync.read_changed()
+        if state is None:
+            return False
+        epoch, duration, running, count, path = state
+        if not running:
+            if not self.is_running:
+                return False
+            self.stop()
+            return True
+        program = self.synced_program(duration, count, path)
+        if program is None:
+            return False
+        if program is not self.program:
+            self.program = program
+            self.progress_duration = program.total
+            self.add_sounds(program.sound_files())
+            self.update_urgency_luts()
+        if self.is_running:
+            self.restart_cycle(epoch, join=True)
+        else:
+            self.start(epoch, join=True)
+        return True
+
+    def synced_program(self, duration, count, path):
+        """ The publisher's program, or None when it can't be rebuilt here and following would drift """
+        if path:
+            if path == self.program.path and abs(duration - self.program.total) <= 1e-9:
+                return self.program
+            try:
+                program = IntervalProgram.load(path, self.check_color)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Phase sync error: {e}")
+                return None
+            if program.count != count or abs(program.total - duration) > 1e-9:
+                print(f"Phase sync error: {path} changed since it was published")
+                return None
+            return program
+        if count != 1:
+            print("Phase sync error: the publisher's program has no file to share; not following it")
+            return None
+        if self.program.path is None and self.program.count == 1 and abs(duration - self.program.total) <= 1e-9:
+            return self.program
+        return IntervalProgram.fixed(duration)
+
+    def schedule_sync_poll(self):
+        # A running Python frame loop checks the segment itself; otherwise a slow timer does.
+        if self.phase_sync is None or self.phase_sync.publisher or self.sync_entry is not None:
+            return
+        if self.is_running and self.tcl_animation is None:
+            return
+        self.sync_entry = self.scheduler.call_later(self.sync_interval, self.poll_sync)
+
+    def poll_sync(self):
+        self.sync_entry = None
+        self.apply_sync()
+        self.schedule_sync_poll()
+
+    def start_timing(self, join=False):
+        self.timing.stop_timer(self)
+        while not self.boundary_events.empty():
+            self.boundary_events.get_nowait()
+        # A new cycle ticks its boundary in progress at once; joining one waits for its next boundary.
+        elapsed = self.clock.now() - self.start_time
+        first_tick = self.program.next_tick_at(elapsed) if join else self.program.tick_at(max(0.0, elapsed))
+        # Streamed ticks start where the timing engine does.
+        self.update_tick_schedule(first_tick)
+        self.timing.start_timer(self, self.start_time, self.program, self.on_boundary, first_tick)
+
+    def update_tick_schedule(self, first_tick=None):
+        # A virtual clock runs far ahead of the audio device, so ticks are played per boundary instead.
+        if self.is_running and self.sound_enabled and self.program.uniform and not self.clock.virtual:
+            if first_tick is None:
+                # Sound switched on mid-cycle joins at the next boundary instead of replaying this one.
+                elapsed = self.clock.now() - self.start_time
+                first_tick = 0 if elapsed < 0 else int(elapsed // self.progress_duration) + 1
+            self.ticks_streamed = self.sound_bank.schedule(self, 'tick', self.start_time, self.progress_duration,
+                                                           first_tick)
+        else:
+            self.ticks_streamed = False
+            if self.sound_bank is not None:
+                self.sound_bank.unschedule(self)
+
+    def on_boundary(self, tick_number, deadline, fired_at):
+        # Runs on the timing thread: play the tick at the deadline, let Tk catch up later.
+        stats = self.stats
+        if stats is not None:
+            stats.record(self.metric_keys['tick_lateness'], fired_at - deadline)
+        if self.ticks_streamed:
+            self.sound_bank.note_boundary(self, tick_number, fired_at)
+        elif self.sound_enabled:
+            program = self.program
+            self.play_tick_sound(program.sounds[tick_number % program.count])
+        self.boundary_events.put((tick_number, deadline, fired_at))
+        for listener in self.boundary_listeners:
+            listener(self, tick_number, deadline, fired_at)
+
+    def on_tcl_boundary(self, tick, index=None):
+        # Called by the Tcl frame proc when a segment starts, or with 'end' when a one-shot program is done.
+        # The proc judged that on the wall clock; the segment is whatever the monotonic clock says it is.
+        index = self.program.locate(max(0.0, self.clock.now() - self.start_time))[1]
+        if index is None:
+            self.stop()
+            return
+        if tick == 'end':
+            self.tcl_animation.resume()
+            return
+        self.tcl_animation.anchor()
+        self.drain_boundary_events()
+        if index != self.segment_index:
+            self.segment_index = index
+            self.renderer.set_color(self.program.colors[index])
+
+    def drain_boundary_events(self):
+        while True:
+            try:
+                tick_number, deadline, fired_at = self.boundary_events.get_nowait()
+            except queue.Empty:
+                return
+            self.last_tick_number = tick_number
+
+    def cancel_frame(self):
+        if self.tcl_animation is not None:
+            self.tcl_animation.stop()
+        if self.frame_after_id is not None:
+            self.scheduler.cancel(self.frame_after_id)
+            self.frame_after_id = None
+
+    def wake_frame(self):
+        # Redraw straight away instead of waiting out an idle-rate sleep.
+        if self.is_running:
+            self.cancel_frame()
+            self.last_fill_px = -1
+            self.animate_progress()
+
+    def next_frame_delay(self, into, segment_duration):
+        until_boundary = segment_duration - into
+        if self.window_visible:
+            seconds_per_px = segment_duration / max(1, self.bar_width)
+            delay = min(seconds_per_px - into % seconds_per_px, until_boundary)
+            if self.countdown is not None:
+                # Also wake when the whole seconds shown next tick over.
+                delay = min(delay, until_boundary - math.ceil(until_boundary) + 1)
+        else:
+            delay = min(self.idle_interval / 1000, until_boundary)
+        return max(self.update_interval, int(math.ceil(delay * 1000)))
+
+    def animate_progress(self):
+        self.frame_after_id = None
+        if not self.is_running:
+            return
+        if self.phase_sync is not None and not self.phase_sync.publisher and self.apply_sync():
+            return
+        if self.tcl_animation is not None:
+            self.tcl_animation.start()
+            self.schedule_sync_poll()
+            return
+        try:
+            started = time.perf_counter()
+            now = self.clock.now()
+            program = self.program
+            cycle, index, into = program.locate(now - self.start_time)
+            self.drain_boundary_events()
+            if index is None:
+                # A one-shot program has run its last segment.
+                self.stop()
+                return
+            if index != self.segment_index:
+                self.segment_index = index
+                self.color_bucket = -1
+                self.renderer.set_color(program.colors[index])
+            segment_duration = program.durations[index]
+            if self.window_visible:
+                luts = self.urgency_luts
+                if luts is not None:
+                    bucket = min(URGENCY_STEPS - 1, int(into / segment_duration * URGENCY_STEPS))
+                    if bucket != self.color_bucket:
+                        self.color_bucket = bucket
+                        self.renderer.set_color(luts[index][bucket])
+                fill_px = int(into / segment_duration * self.bar_width)
+                if fill_px != self.last_fill_px:
+                    self.last_fill_px = fill_px
+                    self.renderer.set_value(fill_px / self.bar_width * 100)
+                if self.countdown is not None:
+                    self.countdown.update(segment_duration - into, cycle)
+            self.frame_after_id = self.scheduler.call_later(self.next_frame_delay(into, segment_duration),
+                                                            self.animate_progress)
+            stats = self.stats
+            if stats is not None:
+                stats.record_interval(self.metric_keys['frame_interval'], now)
+                stats.record(self.metric_keys['animate_progress'], time.perf_counter() - started)
+        except Exception as e:
+            print(f"Animation error: {e}")
+            self.is_running = False
+            self.phase = (self.program, self.start_time, False)
+            self.timing.stop_timer(self)
+            self.renderer.set_value(0)
+
+
+class HUDApp(BarCore):
+    def __init__(self, root, audio_backend=None, fast_start=False, intro='full', timings=False, startup=None,
+                 host=None, duration=6.0, renderer='ttk', clock=None, animation='python', state_path=None):
+        if host is None:
+            host = BarHost(root, audio_backend=audio_backend, fast_start=fast_start, timings=timings, startup=startup,
+                           clock=clock)
+        self.host = host
+        super().__init__(root, host.add_bar(self), host.clock, host.scheduler, host.timing, host.sound_bank,
+                         IntervalProgram.fixed(duration), stats=host.stats)
+        self.stats_overlay = None
+        self.stats_visible_var = tk.BooleanVar(value=False)
+        self.countdown_var = tk.BooleanVar(value=False)
+        self.urgency_var = tk.BooleanVar(value=False)
+        self.intro = intro
+        self.startup = host.startup
+        self.style = host.style
+        self.root.overrideredirect(True)
+        self.root.attributes('-topmost', True)
+        self.default_width = 226
+        self.default_height = 26
+        self.min_width = self.default_width
+        self.min_height = self.default_height
+        self.max_width = self.default_width * 2
+        self.max_height = self.default_height * 2
+
+        # Saved state is read before anything is drawn, so a restarted bar comes back where it was.
+        self.saved_state = None
+        saved = None
+        if state_path is not None and not self.clock.virtual:
+            try:
+                self.saved_state = BarState(state_path)
+                saved = self.saved_state.load()
+            except (OSError, ValueError) as e:
+                print(f"State error: {e}")
+        self.restored = saved is not None and self.valid_size(*saved['geometry'][2:])
+        if self.restored:
+            x, y, width, height = saved['geometry']
+            self.intro = 'none'
+        else:
+            x, y = host.bar_position(self.index, self.default_width, self.default_height)
+            width, height = self.default_width, self.default_height
+        self.base_x = x
+        self.base_y = y
+        self.base_width = width
+        self.base_height = height
+        self.root.geometry(f'{width}x{height}+{x}+{y}')
+        self.root.configure(bg='#222222')
+        sound_enabled = saved['sound'] if saved is not None else True
+        self.sound_enabled_var = tk.BooleanVar(value=sound_enabled)
+        self.sound_enabled = sound_enabled
+        self.sound_enabled_var.trace_add('write', self.on_sound_setting)
+
+        if renderer == 'canvas':
+            self.renderer = CanvasBarRenderer(root)
+        else:
+            self.renderer = TtkBarRenderer(root, self.style, host.color_styles)
+        self.progress = self.renderer.widget
         self.progress.place(relx=0, rely=0, relwidth=1.0, relheight=1.0, anchor='nw')
 
         self.text_canvas = tk.Canvas(self.root, highlightthickness=0, bd=0)
         self.text_canvas.place_forget()
+        self.intro_text_item = None
 
         if platform.system() == "Windows":
             self.menu = None
-            self.custom_menu_window = None
         else:
             self.menu = Menu(root, tearoff=0, bg='#222222', fg='#FFFFFF',
                              activebackground='#4CAF50', activeforeground='#FFFFFF',
                              borderwidth=0, relief='flat')
             self.menu.configure(selectcolor='#4CAF50')
             self.menu.add_command(label="Set Timer (seconds)", command=self.set_timer)
+            self.menu.add_command(label="Load Program...", command=self.choose_program)
             self.menu.add_checkbutton(label="Enable Sound", variable=self.sound_enabled_var, onvalue=True, offvalue=False)
+            self.menu.add_checkbutton(label="Urgency Colors", variable=self.urgency_var, onvalue=True, offvalue=False,
+                                      command=self.on_urgency_setting)
+            self.menu.add_checkbutton(label="Show Countdown", variable=self.countdown_var, onvalue=True, offvalue=False,
+                                      command=self.on_countdown_setting)
+            self.menu.add_checkbutton(label="Show Stats", variable=self.stats_visible_var, onvalue=True, offvalue=False,
+                                      command=self.on_stats_setting)
             self.menu.add_command(label="Close", command=self.quit)
 
         self.progress.bind('<Button-1>', self.start_potential_action)
@@ -158,8 +2517,13 @@ class HUDApp:
         self.root.bind('<Button-1>', self.dismiss_menu)
         self.root.bind('<Escape>', lambda e: self.quit())
         self.root.bind('<Configure>', self.on_resize)
+        self.root.bind('<Map>', self.on_map)
+        self.root.bind('<Unmap>', self.on_unmap)
+        self.root.bind('<Visibility>', self.on_visibility)
+        self.root.bind('<FocusOut>', self.on_focus_out)
+        self.progress.bind('<Expose>', self.on_expose)
         if platform.system() == "Windows":
-            self.root.bind_all('<Button-1>', self.global_dismiss_menu)
+            self.root.bind_all('<Button-1>', self.global_dismiss_menu, add='+')
 
         self.drag_start_x = 0
         self.drag_start_y = 0
@@ -169,91 +2533,169 @@ class HUDApp:
         self.click_x = 0
         self.click_y = 0
         self.resize_margin = 4
+        self.win_w = self.win_h = None
+        self.track_geometry(x, y, width, height)
+        self.cursor_zone = ''
+        self.pointer_held = False
+        self.visibility_state = 'VisibilityUnobscured'
+        self.raise_entry = None
+        self.raise_interval = 1000
+        self.last_raise = 0.0
+        self.pending_motion = None
+        self.motion_entry = None
+        self.motion_interval = 16
+        self.last_motion_applied = 0.0
+        self.custom_menu_window = None
+        self.custom_menu_labels = []
+        self.timer_dialog = None
         self.menu_is_open = False
         self.menu_was_open_on_click = False
 
-        self.is_running = False
-        self.progress_duration = 6.0
-        self.update_interval = 8
-        self.start_time = None
-        self.last_tick_number = -1
+        if saved is not None:
+            self.program = self.restore_program(saved)
+            self.progress_duration = self.program.total
+            self.phase = (self.program, None, False)
+        self.bar_width = width
 
-        self.root.after(1000, self.ensure_on_top)
-        self.startup_effect()
+        # Tcl animation reads Tcl's own clock, so a virtual clock keeps the Python frame loop.
+        use_tcl = animation == 'tcl' and not self.clock.virtual
+        self.tcl_animation = TclAnimation(self) if use_tcl else None
 
+        self.effect_after_id = None
+        if self.intro == 'none':
+            self.finish_startup_effect()
+        else:
+            self.startup_effect()
+        if saved is not None and saved['running']:
+            self.resume(saved['epoch'])
+
+    def valid_size(self, width, height):
+        return self.min_width <= width <= self.max_width and self.min_height <= height <= self.max_height
+
+    def close(self):
+        super().close()
+        self.cancel_raise()
+        for name in ('motion_entry', 'effect_after_id'):
+            entry = getattr(self, name)
+            if entry is not None:
+                self.scheduler.cancel(entry)
+                setattr(self, name, None)
+        self.pending_motion = None
+        if self.stats_overlay is not None:
+            self.stats_overlay.close()
+            self.stats_overlay = None
+        if self.saved_state is not None:
+            self.saved_state.close()
+            self.saved_state = None
+
+    def restore_program(self, saved):
+        if saved['program']:
+            try:
+                program = IntervalProgram.load(saved['program'], self.check_color)
+                self.host.add_sounds(program.sound_files())
+                return program
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Program error: {e}")
         try:
-            signal.signal(signal.SIGINT, self.signal_handler)
-        except AttributeError:
-            pass
+            return IntervalProgram.fixed(saved['duration'])
+        except ValueError:
+            return IntervalProgram.fixed(6.0)
 
-    def play_tick_sound(self):
-        if not self.sound_enabled_var.get():
+    def save_state(self):
+        # A handful of stores into a mapped page: no system call, no fsync, nothing to wait on.
+        if self.saved_state is None:
             return
-        try:
-            sound_file = resource_path('tick.wav')
-            if not hasattr(self, 'tick_sound'):
-                os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-                import contextlib
-                with contextlib.redirect_stdout(open(os.devnull, 'w')), \
-                        contextlib.redirect_stderr(open(os.devnull, 'w')):
-                    import pygame
-                    pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
-                    pygame.mixer.init()
-                self.tick_sound = pygame.mixer.Sound(sound_file)
-            self.tick_sound.play()
-        except Exception as e:
-            print(f"Sound error: {e}")
+        epoch = 0.0 if self.start_time is None else self.start_time - self.clock.now() + time.time()
+        if self.is_animating:
+            geometry = (self.base_x, self.base_y, self.base_width, self.base_height)
+        else:
+            geometry = (self.win_x, self.win_y, self.win_w, self.win_h)
+        self.saved_state.save(epoch, self.program.total, self.is_running, self.sound_enabled, geometry,
+                              self.program.path)
 
-    def get_primary_monitor_geometry(self):
-        if platform.system() == "Windows":
-            try:
-                from ctypes import windll, Structure, c_long
-                class RECT(Structure):
-                    _fields_ = [('left', c_long), ('top', c_long), ('right', c_long), ('bottom', c_long)]
-                rect = RECT()
-                if windll.user32.SystemParametersInfoW(0x0030, 0, ctypes.byref(rect), 0):
-                    width = rect.right - rect.left
-                    height = rect.bottom - rect.top
-                    return rect.left, rect.top, width, height
-            except Exception as e:
-                print(f"Windows monitor detection error: {e}")
-        elif platform.system() == "Linux":
-            try:
-                import subprocess
-                result = subprocess.run(['xrandr', '--query'], stdout=PIPE, stderr=PIPE, text=True)
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if ' connected primary' in line:
-                        parts = line.split()
-                        for part in parts:
-                            if '+' in part and 'x' in part:
-                                size, x_offset, y_offset = part.split('+')
-                                width, height = map(int, size.split('x'))
-                                x = int(x_offset)
-                                y = int(y_offset)
-                                return x, y, width, height
-            except Exception as e:
-                print(f"Linux monitor detection error: {e}")
-        screen_width = self.root.winfo_screenwidth()
-        screen_height = self.root.winfo_screenheight()
-        return 0, 0, screen_width, screen_height
+    def start(self, start_time=None, join=False):
+        if self.is_running:
+            return
+        if self.is_animating:
+            self.skip_startup_effect()
+        super().start(start_time, join)
 
-    def signal_handler(self, sig, frame):
+    def stop(self):
+        if not self.is_running:
+            return
+        super().stop()
+        self.save_state()
+        self.report_audio_gap()
 
-        self.quit()
+    def restart_cycle(self, start_time, join=False):
+        super().restart_cycle(start_time, join)
+        self.save_state()
+
+    def set_program(self, program):
+        super().set_program(program)
+        if not self.is_running:
+            self.save_state()
+
+    def add_sounds(self, sound_files):
+        self.host.add_sounds(sound_files)
+
+    def urgency_lut(self, color):
+        return self.host.urgency_lut(color)
+
+    def on_boundary(self, tick_number, deadline, fired_at):
+        super().on_boundary(tick_number, deadline, fired_at)
+        for listener in self.host.boundary_listeners:
+            listener(self, tick_number, deadline, fired_at)
+
+    def on_sound_setting(self, *args):
+        # Mirrored into a plain attribute so the timing thread never touches Tcl.
+        self.sound_enabled = self.sound_enabled_var.get()
+        self.update_tick_schedule()
+        self.save_state()
+
+    def on_expose(self, event):
+        if self.startup.has('first paint'):
+            return
+        self.startup.mark('first paint')
+        if self.host.fast_start:
+            # Audio is loaded once the bar is on screen, so it never delays the first frame.
+            self.root.after_idle(self.host.preload_audio)
 
     def quit(self):
         self.is_running = False
         self.dismiss_menu()
-        self.root.destroy()
-        sys.exit(0)
+        self.host.remove_bar(self)
 
-    def ensure_on_top(self):
-        if platform.system() == "Windows" and self.menu_is_open:
-            pass
-        else:
-            self.root.attributes('-topmost', True)
-        self.root.after(1000, self.ensure_on_top)
+    def move_to_base(self):
+        if not self.is_animating and not self.is_dragging and not self.is_resizing:
+            self.root.geometry(f'+{self.base_x}+{self.base_y}')
+
+    def schedule_raise(self):
+        # At most one raise per raise_interval, so two overlapping bars can't fight over the top.
+        if self.raise_entry is None:
+            due = self.last_raise + self.raise_interval / 1000 - self.clock.now()
+            self.raise_entry = self.scheduler.call_later(max(0, int(due * 1000)), self.raise_if_obscured)
+
+    def cancel_raise(self):
+        if self.raise_entry is not None:
+            self.scheduler.cancel(self.raise_entry)
+            self.raise_entry = None
+
+    def raise_if_obscured(self, force=False):
+        self.raise_entry = None
+        if self.menu_is_open and platform.system() == "Windows":
+            # The custom menu is a topmost window of its own; raising the bar would put it behind.
+            return
+        if not force and self.visibility_state == 'VisibilityUnobscured':
+            return
+        self.last_raise = self.clock.now()
+        self.root.attributes('-topmost', True)
+        self.root.lift()
+
+    def on_focus_out(self, event):
+        # The check runs once the window that took focus has been stacked and reported.
+        if event.widget is self.root:
+            self.schedule_raise()
 
     def show_menu(self, event):
         if self.menu_is_open:
@@ -262,42 +2704,43 @@ class HUDApp:
         self.click_x = event.x_root
         self.click_y = event.y_root
         if platform.system() == "Windows":
-            self.create_custom_menu(event.x_root, event.y_root)
+            self.show_custom_menu(event.x_root, event.y_root)
         else:
             self.menu.post(event.x_root, event.y_root)
 
-    def create_custom_menu(self, x, y):
-        if self.custom_menu_window:
-            self.custom_menu_window.destroy()
-            self.custom_menu_window = None
-
-        self.custom_menu_window = tk.Toplevel(self.root)
-        self.custom_menu_window.overrideredirect(True)
-        self.custom_menu_window.configure(bg='#222222', highlightthickness=0, bd=0, relief='flat')
-        self.custom_menu_window.attributes('-topmost', True)
-        self.root.attributes('-topmost', False)
-        self.custom_menu_window.lift()
+    def build_custom_menu(self):
+        # Built on first use and then only shown and hidden; check marks are updated in place.
+        window = tk.Toplevel(self.root)
+        window.withdraw()
+        window.overrideredirect(True)
+        window.configure(bg='#222222', highlightthickness=0, bd=0, relief='flat')
+        window.attributes('-topmost', True)
 
         items = [
             ("Set Timer (seconds)", self.set_timer),
+            ("Load Program...", self.choose_program),
             ("Enable Sound", self.toggle_sound),
+            ("Urgency Colors", self.toggle_urgency),
+            ("Show Countdown", self.toggle_countdown),
+            ("Show Stats", self.toggle_stats),
             ("Close", self.quit)
         ]
+        checks = {"Enable Sound": self.sound_enabled_var, "Urgency Colors": self.urgency_var,
+                  "Show Countdown": self.countdown_var,
+                  "Show Stats": self.stats_visible_var}
+        self.custom_menu_labels = []
 
-        for i, (label, command) in enumerate(items):
-            text = label
-            if label == "Enable Sound":
-                text = "✓ Enable Sound" if self.sound_enabled_var.get() else "  Enable Sound"
-
-            btn = tk.Label(self.custom_menu_window, text=text, bg='#222222', fg='#FFFFFF',
+        for label, command in items:
+            btn = tk.Label(window, text=label, bg='#222222', fg='#FFFFFF',
                            font=('Arial', 9), padx=10, pady=4, anchor='w')
             btn.pack(fill='x')
+            self.custom_menu_labels.append((btn, label, checks.get(label)))
 
-            if label == "Enable Sound":
-                def on_click_sound(e):
-                    self.toggle_sound()
+            if label in checks:
+                def on_click_check(e, cmd=command):
+                    cmd()
                     self.dismiss_menu()
-                btn.bind('<Button-1>', on_click_sound)
+                btn.bind('<Button-1>', on_click_check)
             else:
                 def on_click(e, cmd=command):
                     self.dismiss_menu()
@@ -311,16 +2754,49 @@ class HUDApp:
             btn.bind('<Enter>', on_enter)
             btn.bind('<Leave>', on_leave)
 
-        self.custom_menu_window.update_idletasks()
-        self.custom_menu_window.geometry(f'+{x}+{y}')
+        self.custom_menu_window = window
 
+    def show_custom_menu(self, x, y):
+        if self.custom_menu_window is None:
+            self.build_custom_menu()
+        for btn, label, var in self.custom_menu_labels:
+            # A withdrawn window never gets <Leave>, so clear any hover highlight too.
+            text = label if var is None else ("✓ " if var.get() else "  ") + label
+            btn.configure(text=text, bg='#222222')
+        self.root.attributes('-topmost', False)
+        self.custom_menu_window.geometry(f'+{x}+{y}')
+        self.custom_menu_window.deiconify()
+        self.custom_menu_window.lift()
 
     def toggle_sound(self):
         self.sound_enabled_var.set(not self.sound_enabled_var.get())
-        if platform.system() == "Windows" and self.menu_is_open:
-            self.dismiss_menu()
-            self.menu_is_open = True
-            self.create_custom_menu(self.click_x, self.click_y)
+
+    def toggle_urgency(self):
+        self.urgency_var.set(not self.urgency_var.get())
+        self.on_urgency_setting()
+
+    def on_urgency_setting(self):
+        self.set_urgency(self.urgency_var.get())
+
+    def toggle_countdown(self):
+        self.countdown_var.set(not self.countdown_var.get())
+        self.on_countdown_setting()
+
+    def on_countdown_setting(self):
+        self.set_countdown(self.countdown_var.get())
+
+    def toggle_stats(self):
+        self.stats_visible_var.set(not self.stats_visible_var.get())
+        self.on_stats_setting()
+
+    def on_stats_setting(self):
+        if self.stats_visible_var.get():
+            self.host.enable_stats()
+            if self.stats_overlay is None:
+                self.stats_overlay = StatsOverlay(self)
+        elif self.stats_overlay is not None:
+            self.stats_overlay.close()
+            self.stats_overlay = None
 
     def dismiss_menu(self, event=None):
         if not self.menu_is_open:
@@ -329,8 +2805,7 @@ class HUDApp:
         if platform.system() == "Windows":
             self.menu_was_open_on_click = True
             if self.custom_menu_window:
-                self.custom_menu_window.destroy()
-                self.custom_menu_window = None
+                self.custom_menu_window.withdraw()
             self.root.attributes('-topmost', True)
             self.root.after(200, lambda: setattr(self, 'menu_was_open_on_click', False))
         else:
@@ -345,41 +2820,51 @@ class HUDApp:
 
     def set_timer(self):
         self.menu_was_open_on_click = False
-        dialog = CustomDialog(self.root, initialvalue=str(self.progress_duration))
-        if dialog.result is not None and 1.0 <= dialog.result <= 10.0:
-            self.progress_duration = dialog.result
-            print(f"Set duration: {dialog.result} seconds")
-            if self.is_running:
-                now = time.perf_counter()
-                self.start_time = now - (now % self.progress_duration)
-                self.progress['value'] = 0
-                self.animate_progress()
+        if self.timer_dialog is None:
+            self.timer_dialog = CustomDialog(self.root)
+        result = self.timer_dialog.ask(str(self.progress_duration))
+        if result is not None and self.set_duration(result):
+            print(f"Set duration: {result} seconds")
         else:
             print("Invalid or cancelled input.")
 
+    def load_program(self, path):
+        try:
+            program = IntervalProgram.load(path, self.check_color)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Program error: {e}")
+            return False
+        self.set_program(program)
+        print(f"Loaded program: {program.name} ({program.count} segments, {program.total:g} seconds)")
+        return True
+
+    def choose_program(self):
+        from tkinter import filedialog
+        self.menu_was_open_on_click = False
+        path = filedialog.askopenfilename(parent=self.root, title="Load Program",
+                                          filetypes=[("Programs", "*.json"), ("All files", "*")])
+        if path:
+            self.load_program(path)
+
     def update_cursor(self, event):
-        x, y = event.x, event.y
-        w, h = self.root.winfo_width(), self.root.winfo_height()
+        zone = self.hit_zone(event.x, event.y)
+        if zone != self.cursor_zone:
+            self.cursor_zone = zone
+            self.root.config(cursor=ZONE_CURSORS[zone])
+
+    def hit_zone(self, x, y):
+        # Edge/corner under the pointer: '', 'n', 's', 'e', 'w' or a corner such as 'nw'.
         margin = self.resize_margin
+        horizontal = 'w' if x < margin else 'e' if x > self.zone_right else ''
+        vertical = 'n' if y < margin else 's' if y > self.zone_bottom else ''
+        return vertical + horizontal
 
-        if x < margin and y < margin:
-            self.root.config(cursor='top_left_corner')
-        elif x > w - margin and y < margin:
-            self.root.config(cursor='top_right_corner')
-        elif x < margin and y > h - margin:
-            self.root.config(cursor='bottom_left_corner')
-        elif x > w - margin and y > h - margin:
-            self.root.config(cursor='bottom_right_corner')
-        elif x < margin:
-            self.root.config(cursor='left_side')
-        elif x > w - margin:
-            self.root.config(cursor='right_side')
-        elif y < margin:
-            self.root.config(cursor='top_side')
-        elif y > h - margin:
-            self.root.config(cursor='bottom_side')
-        else:
-            self.root.config(cursor='')
+    def track_geometry(self, x, y, width, height):
+        self.win_x, self.win_y = x, y
+        if (width, height) != (self.win_w, self.win_h):
+            self.win_w, self.win_h = width, height
+            self.zone_right = width - self.resize_margin
+            self.zone_bottom = height - self.resize_margin
 
     def start_potential_action(self, event):
         if self.menu_is_open:
@@ -388,45 +2873,49 @@ class HUDApp:
             return
 
         self.menu_was_open_on_click = False
+        self.pointer_held = True
         self.click_x = event.x_root
         self.click_y = event.y_root
-        self.drag_start_x = event.x_root - self.root.winfo_x()
-        self.drag_start_y = event.y_root - self.root.winfo_y()
+        self.drag_start_x = event.x_root - self.win_x
+        self.drag_start_y = event.y_root - self.win_y
         self.is_dragging = False
         self.is_resizing = False
-        self.resize_edge = None
-
-        x, y = event.x, event.y
-        w, h = self.root.winfo_width(), self.root.winfo_height()
-        margin = self.resize_margin
-
-        if x < margin and y < margin:
-            self.resize_edge = 'nw'
-        elif x > w - margin and y < margin:
-            self.resize_edge = 'ne'
-        elif x < margin and y > h - margin:
-            self.resize_edge = 'sw'
-        elif x > w - margin and y > h - margin:
-            self.resize_edge = 'se'
-        elif x < margin:
-            self.resize_edge = 'w'
-        elif x > w - margin:
-            self.resize_edge = 'e'
-        elif y < margin:
-            self.resize_edge = 'n'
-        elif y > h - margin:
-            self.resize_edge = 's'
+        self.resize_edge = self.hit_zone(event.x, event.y) or None
 
         if self.resize_edge:
             self.is_resizing = True
 
     def on_motion(self, event):
+        # Keep only the latest pointer; geometry is applied at most once per frame.
         if self.menu_was_open_on_click:
             return
+        self.pending_motion = event
+        if self.motion_entry is None:
+            due = self.last_motion_applied + self.motion_interval / 1000 - self.clock.now()
+            self.motion_entry = self.scheduler.call_later(max(0, int(due * 1000)), self.apply_motion)
+
+    def flush_motion(self):
+        if self.motion_entry is not None:
+            self.scheduler.cancel(self.motion_entry)
+            self.apply_motion()
+
+    def apply_motion(self):
+        self.motion_entry = None
+        event, self.pending_motion = self.pending_motion, None
+        if event is None:
+            return
+        self.last_motion_applied = self.clock.now()
+        started = time.perf_counter()
         if self.is_resizing:
             self.handle_resize(event)
+            metric = 'handle_resize'
         elif abs(event.x_root - self.click_x) > 5 or abs(event.y_root - self.click_y) > 5:
             self.handle_drag(event)
+            metric = 'handle_drag'
+        else:
+            return
+        if self.stats is not None:
+            self.stats.record(self.metric_keys[metric], time.perf_counter() - started)
 
     def handle_drag(self, event):
         try:
@@ -434,14 +2923,15 @@ class HUDApp:
             x = event.x_root - self.drag_start_x
             y = event.y_root - self.drag_start_y
             self.root.geometry(f'+{x}+{y}')
+            self.track_geometry(x, y, self.win_w, self.win_h)
         except Exception as e:
             print(f"Drag error: {e}")
 
     def handle_resize(self, event):
         try:
             x, y = event.x_root, event.y_root
-            curr_x, curr_y = self.root.winfo_x(), self.root.winfo_y()
-            curr_w, curr_h = self.root.winfo_width(), self.root.winfo_height()
+            curr_x, curr_y = self.win_x, self.win_y
+            curr_w, curr_h = self.win_w, self.win_h
 
             new_w = curr_w
             new_h = curr_h
@@ -460,122 +2950,588 @@ class HUDApp:
                 new_y = y if new_h < self.max_height else curr_y
 
             self.root.geometry(f'{new_w}x{new_h}+{new_x}+{new_y}')
+            self.track_geometry(new_x, new_y, new_w, new_h)
         except Exception as e:
             print(f"Resize error: {e}")
 
     def on_resize(self, event):
+        # While the button is held our own values are newer than any Configure still in the queue.
+        if event.widget is self.root and not self.pointer_held:
+            if (event.x, event.y, event.width, event.height) == (self.win_x, self.win_y, self.win_w, self.win_h):
+                # Same geometry: a stacking change, which may have put something over the bar.
+                self.schedule_raise()
+            self.track_geometry(event.x, event.y, event.width, event.height)
+        if event.widget is self.progress:
+            if event.width != self.bar_width:
+                self.bar_width = event.width
+                self.last_fill_px = -1
+                if self.tcl_animation is not None:
+                    self.wake_frame()
+            if self.countdown is not None:
+                self.countdown.layout(event.width, event.height)
         self.progress.place_configure(relwidth=1.0, relheight=1.0)
         if self.text_canvas.winfo_ismapped():
             self.text_canvas.place(relx=0, rely=0, relwidth=1.0, relheight=1.0)
 
     def toggle_progress(self, event):
+        self.flush_motion()
+        self.pointer_held = False
+        if self.is_dragging or self.is_resizing:
+            # Saved once on release; the motion handlers themselves never write state.
+            self.save_state()
+        if self.is_animating and not self.is_dragging and not self.is_resizing and not self.menu_is_open:
+            # The click that skips the intro is spent on that; the next one starts the timer.
+            self.skip_startup_effect()
+            return
         if not self.is_dragging and not self.is_resizing and not self.is_animating and not self.menu_is_open and not self.menu_was_open_on_click:
             self.root.config(cursor='')
+            self.cursor_zone = ''
+            if not self.startup.has('first interactive click'):
+                self.startup.mark('first interactive click')
+                if self.host.print_startup:
+                    print(self.startup.report())
             if not self.is_running:
-                self.is_running = True
-                self.start_time = time.perf_counter()
-                self.progress['value'] = 0
-                self.last_tick_number = -1
-                self.animate_progress()
+                self.start()
             else:
-                self.is_running = False
-                self.progress['value'] = 0
+                self.stop()
 
-    def animate_progress(self):
-        if not self.is_running:
+    def report_audio_gap(self):
+        stats = self.sound_bank.gap_stats()
+        if stats:
+            print(f"Audio/visual gap over {stats['ticks']} ticks: mean {stats['mean_gap_ms']:.3f} ms, "
+                  f"max {stats['max_gap_ms']:.3f} ms, clock error {stats['clock_error_ms']:.3f} ms")
+
+    def on_map(self, event):
+        if event.widget is not self.root:
             return
-        try:
-            now = time.perf_counter()
-            elapsed = now - self.start_time
-            progress = (elapsed % self.progress_duration) / self.progress_duration * 100
-            self.progress['value'] = progress
-            current_tick_number = int(elapsed // self.progress_duration)
-            if current_tick_number != self.last_tick_number:
-                self.last_tick_number = current_tick_number
-                if self.sound_enabled_var.get():
-                    self.play_tick_sound()
-            self.root.after(self.update_interval, self.animate_progress)
-        except Exception as e:
-            print(f"Animation error: {e}")
-            self.is_running = False
-            self.progress['value'] = 0
+        # Some window managers drop the topmost state across an unmap, so re-assert it.
+        self.cancel_raise()
+        self.raise_if_obscured(force=True)
+        self.set_visible(True)
+
+    def on_unmap(self, event):
+        if event.widget is self.root:
+            self.cancel_raise()
+            self.set_visible(False)
+
+    def on_visibility(self, event):
+        # Only the toplevel's own visibility counts; our overlay canvases don't obscure it.
+        if event.widget is not self.root:
+            return
+        self.visibility_state = event.state
+        self.set_visible(event.state != 'VisibilityFullyObscured')
+        if event.state != 'VisibilityUnobscured':
+            self.schedule_raise()
 
     def startup_effect(self):
-        import math
-        self.animation_step = 0
-        self.max_steps = 240
         self.effect_interval = 16
-        self.progress['value'] = 0
+        self.renderer.set_value(0)
         self.is_animating = True
-        self.original_width = self.default_width
-        self.original_height = self.default_height
-        self.original_x = self.base_x
-        self.original_y = self.base_y
-        self.expanded_width = int(self.default_width * 1.5)
-        self.expanded_height = int(self.default_height * 1.5)
-        self.expanded_x = self.base_x - (self.expanded_width - self.default_width) // 2
-        self.expanded_y = self.base_y - (self.expanded_height - self.default_height) // 2
-        self.wave_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7', '#DDA0DD', '#98D8C8', '#4CAF50']
-
-        def wave_animation():
-            if self.animation_step < self.max_steps:
-                if self.animation_step < 30:
-                    expand_progress = self.animation_step / 30
-                    ease_progress = 1 - (1 - expand_progress) ** 3
-                    current_width = int(self.original_width + (self.expanded_width - self.original_width) * ease_progress)
-                    current_height = int(self.original_height + (self.expanded_height - self.original_height) * ease_progress)
-                    current_x = int(self.original_x + (self.expanded_x - self.original_x) * ease_progress)
-                    current_y = int(self.original_y + (self.expanded_y - self.original_y) * ease_progress)
-                    self.root.geometry(f'{current_width}x{current_height}+{current_x}+{current_y}')
-                elif self.animation_step > self.max_steps - 60:
-                    shrink_start = self.max_steps - 60
-                    shrink_progress = (self.animation_step - shrink_start) / 60
-                    ease_progress = shrink_progress ** 2
-                    current_width = int(self.expanded_width - (self.expanded_width - self.original_width) * ease_progress)
-                    current_height = int(self.expanded_height - (self.expanded_height - self.original_height) * ease_progress)
-                    current_x = int(self.expanded_x - (self.expanded_x - self.original_x) * ease_progress)
-                    current_y = int(self.expanded_y - (self.expanded_y - self.original_y) * ease_progress)
-                    self.root.geometry(f'{current_width}x{current_height}+{current_x}+{current_y}')
-
-                wave_progress = (math.sin(self.animation_step * 0.1) + 1) / 2
-                linear_progress = min(1.0, self.animation_step / (self.max_steps - 80))
-                combined_progress = (wave_progress * 0.1 + linear_progress * 1) * 100
-                color_index = int((self.animation_step / 25) % len(self.wave_colors))
-                self.style.configure('green.Horizontal.TProgressbar', background=self.wave_colors[color_index])
-                self.progress['value'] = min(combined_progress, 100)
-
-                if self.animation_step > self.max_steps - 80:
-                    if self.animation_step == self.max_steps - 79:
-                        self.progress['value'] = 100
-                        self.style.configure('green.Horizontal.TProgressbar', background=self.wave_colors[-1])
-                        self.text_canvas.place(relx=0, rely=0, relwidth=1.0, relheight=1.0)
-                        self.play_tick_sound()
-
-                    chars_to_show = min(9, (self.animation_step - (self.max_steps - 80)) // 8)
-                    text = "T I C K B A R"[:chars_to_show * 2 - 1] if chars_to_show > 0 else ""
-                    self.text_canvas.delete("all")
-                    if text:
-                        window_width = self.root.winfo_width()
-                        window_height = self.root.winfo_height()
-                        self.text_canvas.create_text(window_width//2, window_height//2,
-                                                    text=text, fill='#000000',
-                                                    font=('Arial', 10, 'bold'), anchor='center')
-
-                self.animation_step += 1
-                self.root.after(self.effect_interval, wave_animation)
+        self.keyframes = build_intro_keyframes(self.default_width, self.default_height, self.base_x, self.base_y)
+        self.reveal_step = len(self.keyframes) - 79
+        self.animation_step = 0
+        self.applied_keyframe = (None, None, None, None)
+        self.intro_text_item = None
+        self.intro_started = self.clock.now()
+        self.effect_after_id = self.scheduler.call_later(0, self.wave_animation)
+
+    def wave_animation(self):
+        # Frames are picked by elapsed time, so a loaded machine drops frames instead of running long.
+        self.effect_after_id = None
+        started = time.perf_counter()
+        step = int((self.clock.now() - self.intro_started) * 1000 / self.effect_interval)
+        if step >= len(self.keyframes):
+            self.finish_startup_effect()
+            return
+        if self.animation_step <= self.reveal_step <= step:
+            self.text_canvas.place(relx=0, rely=0, relwidth=1.0, relheight=1.0)
+            width, height = self.keyframes[step][0][:2]
+            self.intro_text_item = self.text_canvas.create_text(width // 2, height // 2, text='', fill='#000000',
+                                                                font=('Arial', 10, 'bold'), anchor='center')
+            self.play_tick_sound()
+        self.apply_keyframe(self.keyframes[step])
+        self.animation_step = step + 1
+        next_frame_at = self.intro_started + self.animation_step * self.effect_interval / 1000
+        delay = max(1, int(round((next_frame_at - self.clock.now()) * 1000)))
+        self.effect_after_id = self.scheduler.call_later(delay, self.wave_animation)
+        if self.stats is not None:
+            self.stats.record(self.metric_keys['wave_animation'], time.perf_counter() - started)
+
+    def apply_keyframe(self, keyframe):
+        geometry, color_index, value, text = keyframe
+        last_geometry, last_color_index, last_value, last_text = self.applied_keyframe
+        if geometry != last_geometry:
+            width, height, x, y = geometry
+            self.root.geometry(f'{width}x{height}+{x}+{y}')
+            if self.intro_text_item is not None:
+                self.text_canvas.coords(self.intro_text_item, width // 2, height // 2)
+        if color_index != last_color_index:
+            self.renderer.set_color(INTRO_COLORS[color_index])
+        if value != last_value:
+            self.renderer.set_value(value)
+        if text != last_text and self.intro_text_item is not None:
+            self.text_canvas.itemconfigure(self.intro_text_item, text=text)
+        self.applied_keyframe = keyframe
+
+    def skip_startup_effect(self):
+        if self.effect_after_id is not None:
+            self.scheduler.cancel(self.effect_after_id)
+            self.effect_after_id = None
+        self.finish_startup_effect()
+
+    def finish_startup_effect(self):
+        self.root.geometry(f'{self.base_width}x{self.base_height}+{self.base_x}+{self.base_y}')
+        if self.intro_text_item is not None:
+            self.text_canvas.delete(self.intro_text_item)
+            self.intro_text_item = None
+        self.text_canvas.place_forget()
+        self.renderer.set_value(0)
+        self.renderer.set_color('#4CAF50')
+        self.is_animating = False
+
+def ansi_color(color):
+    try:
+        r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    except (TypeError, ValueError):
+        return ''
+    return f"\x1b[38;2;{r};{g};{b}m"
+
+class TerminalBar:
+    """ The bar as one ANSI line, driven by the same program and timing engine as the window """
+    sound_timeout = 2.0
+
+    def __init__(self, program, sound_bank=None, out=None, width=None, clock=None):
+        self.program = program
+        self.sound_bank = sound_bank
+        self.clock = clock or RealClock(None)
+        self.out = out or sys.stdout
+        # On a terminal the bar is drawn; piped into a script, each boundary is printed as a line instead.
+        self.interactive = self.out.isatty()
+        columns = width or shutil.get_terminal_size().columns
+        self.width = max(10, columns - 12)
+        self.colors = [ansi_color(color) for color in program.colors]
+        self.timing = TimingEngine(clock=self.clock if self.clock.virtual else None)
+        self.boundary_events = queue.Queue()
+        self.last_tick_number = -1
+        self.max_ticks = None
+        self.shown = None
+        self.start_time = None
+
+    def on_boundary(self, tick_number, deadline, fired_at):
+        # Runs on the timing thread, as in the window: tick at the deadline, draw afterwards.
+        if self.sound_bank is not None:
+            name = self.program.sounds[tick_number % self.program.count]
+            if name is not None:
+                self.sound_bank.play(name)
+        self.boundary_events.put((tick_number, deadline, fired_at))
+
+    def handle_boundary(self, tick_number, deadline, fired_at):
+        if self.max_ticks is not None and tick_number >= self.max_ticks:
+            return
+        self.last_tick_number = tick_number
+        if not self.interactive:
+            self.out.write(f"tick {tick_number} {deadline - self.start_time:.6f}\n")
+            self.out.flush()
+
+    def draw(self, index, into, cycle):
+        segment_duration = self.program.durations[index]
+        cells = int(into / segment_duration * self.width)
+        shown = (cells, index, math.ceil(segment_duration - into), cycle)
+        if shown == self.shown:
+            return
+        self.shown = shown
+        bar = '█' * cells + '░' * (self.width - cells)
+        self.out.write(f"\r{self.colors[index]}{bar}\x1b[0m {format_countdown(shown[2], cycle):>10}")
+        self.out.flush()
+
+    def next_delay(self, into, segment_duration):
+        # Sleep until a cell fills, the whole seconds change or the segment ends, whichever comes first.
+        until_boundary = segment_duration - into
+        seconds_per_cell = segment_duration / self.width
+        delay = min(seconds_per_cell - into % seconds_per_cell, until_boundary - math.ceil(until_boundary) + 1,
+                    until_boundary)
+        return max(0.001, delay)
+
+    def run(self, cycles=None):
+        program = self.program
+        if cycles is not None:
+            self.max_ticks = cycles * program.count
+        # The first boundary fires as soon as the timer starts, so its tick needs the sounds decoded by then.
+        if self.sound_bank is not None and not self.sound_bank.ready.wait(self.sound_timeout):
+            print("Sound error: audio is still loading, the first ticks may be silent", file=sys.stderr)
+        self.start_time = self.clock.now()
+        self.timing.start_timer(self, self.start_time, program, self.on_boundary)
+        if self.interactive:
+            self.out.write("\x1b[?25l")
+        try:
+            while True:
+                cycle, index, into = program.locate(self.clock.now() - self.start_time)
+                if index is None or (cycles is not None and cycle >= cycles):
+                    break
+                if self.interactive:
+                    self.draw(index, into, cycle)
+                delay = self.next_delay(into, program.durations[index])
+                try:
+                    if self.clock.virtual:
+                        # Simulated time is moved rather than slept through; due boundaries fire on the way.
+                        self.clock.advance(delay)
+                        event = self.boundary_events.get_nowait()
+                    else:
+                        event = self.boundary_events.get(timeout=delay)
+                except queue.Empty:
+                    continue
+                self.handle_boundary(*event)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.timing.shutdown()
+            while not self.boundary_events.empty():
+                self.handle_boundary(*self.boundary_events.get_nowait())
+            if self.interactive:
+                self.out.write("\x1b[?25h\n")
+                self.out.flush()
+            if self.sound_bank is not None:
+                self.sound_bank.close()
+        return 0
+
+def run_terminal(args):
+    duration = args.durations[0] if args.durations else 6.0
+    try:
+        program = IntervalProgram.load(args.program) if args.program else IntervalProgram.fixed(duration)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Program error: {e}", file=sys.stderr)
+        return 1
+    sound_bank = None
+    if args.sound:
+        sound_bank = SoundBank(env_audio_backend())
+        sound_bank.preload({'tick': resource_path('tick.wav'), **program.sound_files()})
+    return TerminalBar(program, sound_bank).run(cycles=args.cycles)
+
+class TickBar(BarCore):
+    """ The bar as a plain widget for a host application's own Tk window or frame.
+
+    It runs the same cycle and frame loop as the window bar, but never touches the toplevel,
+    the ttk theme, signal handlers or the process; the host places `widget` like any other
+    widget and owns the event loop.
+    """
+    ids = itertools.count()
+
+    def __init__(self, master, duration=6.0, program=None, width=226, height=26, sound_bank=None, timing=None,
+                 animation='python', countdown=False, urgency=False):
+        load_tk()
+        clock = RealClock(master)
+        self.owns_timing = timing is None
+        super().__init__(master, f'embedded{next(self.ids)}', clock, FrameScheduler(clock), timing or TimingEngine(),
+                         sound_bank, program or IntervalProgram.fixed(duration))
+        # Canvas items only, so embedding never switches the host's ttk theme.
+        self.renderer = CanvasBarRenderer(master)
+        self.widget = self.progress = self.renderer.widget
+        self.widget.configure(width=width, height=height)
+        self.bar_width = width
+        self.closed = False
+        self.add_sounds(self.program.sound_files())
+        if animation == 'tcl':
+            self.tcl_animation = TclAnimation(self)
+        self.set_urgency(urgency)
+        self.set_countdown(countdown)
+        self.widget.bind('<Configure>', self.on_configure, add='+')
+        self.widget.bind('<Map>', lambda e: self.set_visible(True), add='+')
+        self.widget.bind('<Unmap>', lambda e: self.set_visible(False), add='+')
+        self.widget.bind('<Destroy>', self.on_destroy, add='+')
+
+    def set_duration(self, duration):
+        # The window's 1-10 s menu range is a UI choice; embedders get any duration a program accepts.
+        self.set_program(IntervalProgram.fixed(duration))
+        return True
+
+    def on_configure(self, event):
+        if event.width != self.bar_width:
+            self.bar_width = event.width
+            self.wake_frame()
+        if self.countdown is not None:
+            self.countdown.layout(event.width, event.height)
+
+    def on_destroy(self, event):
+        if event.widget is self.widget:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        super().close()
+        if self.owns_timing:
+            self.timing.shutdown()
+
+def settle(future, result=None, error=None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+class AsyncBridge:
+    """ Runs calls on the Tk thread for an asyncio loop on another thread, and hands results back.
+
+    Each side is woken through its own loop: Tk by a byte on a socket pair it watches with a
+    file handler, asyncio by call_soon_threadsafe. Neither side polls the other. Create it on
+    the Tk thread, before or while that thread runs mainloop().
+    """
+    def __init__(self, root, loop):
+        load_tk()
+        self.root = root
+        self.loop = loop
+        self.calls = queue.Queue()
+        self.reader = self.writer = None
+        self.command = None
+        self.closed = False
+        if hasattr(root.tk, 'createfilehandler') and platform.system() != "Windows":
+            self.reader, self.writer = socket.socketpair()
+            self.reader.setblocking(False)
+            self.writer.setblocking(False)
+            root.tk.createfilehandler(self.reader, tk.READABLE, self.on_wake)
+        else:
+            # No file handlers here: tkinter's own cross-thread call marshalling wakes the Tk thread.
+            self.command = root.register(self.run_calls)
+
+    def call_soon(self, func, *args):
+        """ Run func(*args) on the Tk thread; safe from any thread, dropped once the bridge is closed """
+        if self.closed:
+            return
+        self.calls.put((func, args))
+        if self.command is not None:
+            self.root.tk.call('after', 0, self.command)
+            return
+        try:
+            self.writer.send(b'\0')
+        except BlockingIOError:
+            # The socket is full of wakes the Tk thread hasn't read yet; one more adds nothing.
+            pass
+        except OSError:
+            # Closed from the Tk thread while we were queueing.
+            pass
+
+    def call(self, func, *args):
+        """ Future for func(*args) run on the Tk thread; call it from the asyncio loop """
+        future = self.loop.create_future()
+
+        def run():
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.to_loop(settle, future, None, e)
             else:
-                self.root.geometry(f'{self.original_width}x{self.original_height}+{self.original_x}+{self.original_y}')
-                self.text_canvas.place_forget()
-                self.progress['value'] = 0
-                self.style.configure('green.Horizontal.TProgressbar', background='#4CAF50')
-                self.is_animating = False
+                self.to_loop(settle, future, result)
+
+        self.call_soon(run)
+        return future
+
+    def to_loop(self, func, *args):
+        """ Run func(*args) on the asyncio loop; safe from any thread """
+        try:
+            self.loop.call_soon_threadsafe(func, *args)
+        except RuntimeError:
+            # The loop has been closed; there is nobody left to tell.
+            pass
+
+    def on_wake(self, sock, mask):
+        try:
+            while self.reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        self.run_calls()
+
+    def run_calls(self):
+        while True:
+            try:
+                func, args = self.calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Bridge call error: {e}")
 
-        self.root.after(0, wave_animation)
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.reader is not None:
+            self.root.tk.deletefilehandler(self.reader)
+            self.reader.close()
+            self.writer.close()
+        elif self.command is not None:
+            self.root.deletecommand(self.command)
+
+class AsyncTickBar:
+    """ A TickBar driven from asyncio: coroutine controls, a state snapshot and cycle events.
+
+    Events are dicts with tick, cycle, segment, label, deadline and late (seconds the
+    boundary fired after its deadline). They are handed to the loop straight from the
+    timing thread, so they don't wait for Tk.
+    """
+    def __init__(self, bar, bridge):
+        self.bar = bar
+        self.bridge = bridge
+        self.subscribers = set()
+        bar.add_boundary_listener(self.on_boundary)
+
+    @classmethod
+    async def create(cls, bridge, master, **options):
+        """ Build a TickBar in `master` on the Tk thread and wrap it """
+        bar = await bridge.call(lambda: TickBar(master, **options))
+        return cls(bar, bridge)
+
+    @property
+    def state(self):
+        return self.bar.state()
+
+    async def start(self, offset=0.0):
+        # The epoch is taken here, so the hop to the Tk thread doesn't shift the phase.
+        await self.bridge.call(self.bar.start, time.perf_counter() - offset)
+
+    async def stop(self):
+        await self.bridge.call(self.bar.stop)
+
+    async def rephase(self, offset=0.0):
+        await self.bridge.call(self.bar.rephase, offset)
+
+    async def set_duration(self, duration):
+        await self.bridge.call(self.bar.set_duration, duration)
+
+    async def set_program(self, program):
+        await self.bridge.call(self.bar.set_program, program)
+
+    async def close(self):
+        self.bar.remove_boundary_listener(self.on_boundary)
+        await self.bridge.call(self.bar.close)
+
+    async def events(self):
+        """ Async iterator over the cycle boundaries that fire while it is being iterated """
+        import asyncio
+        events = asyncio.Queue()
+        self.subscribers.add(events)
+        try:
+            while True:
+                yield await events.get()
+        finally:
+            self.subscribers.discard(events)
+
+    def on_boundary(self, bar, tick_number, deadline, fired_at):
+        # Timing thread: one call_soon_threadsafe per boundary, and none when nobody is listening.
+        if not self.subscribers:
+            return
+        program = bar.program
+        cycle, index = divmod(tick_number, program.count)
+        event = {'tick': tick_number, 'cycle': cycle, 'segment': index, 'label': program.labels[index],
+                 'deadline': deadline, 'late': fired_at - deadline}
+        self.bridge.to_loop(self.publish, event)
+
+    def publish(self, event):
+        for events in self.subscribers:
+            events.put_nowait(event)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Minimal always-on-top cycle timer bar.")
+    parser.add_argument('--fast-start', action='store_true',
+                        help="use the cached monitor geometry, skip the intro, defer audio and print startup timings")
+    parser.add_argument('--intro', choices=['full', 'none'], default=None,
+                        help="play or skip the startup animation (default: full, none with --fast-start)")
+    parser.add_argument('--timings', action='store_true', help="print the startup timing breakdown")
+    parser.add_argument('--renderer', choices=RENDERERS, default='ttk',
+                        help="draw the bar with the themed ttk.Progressbar or with plain canvas items")
+    parser.add_argument('--animation', choices=ANIMATIONS, default='python',
+                        help="run the fill animation in Python, or as a Tcl proc that only calls Python at boundaries")
+    parser.add_argument('--control', nargs='?', const=default_control_path(), metavar='PATH',
+                        help="serve the control protocol on a Unix socket (default: %(const)s)")
+    parser.add_argument('--send', metavar='COMMAND',
+                        help="send one control command to a running bar, print the reply and exit")
+    parser.add_argument('--program', metavar='FILE',
+                        help="run an interval program (JSON segments of duration, color and sound) on every bar")
+    parser.add_argument('--urgency', action='store_true',
+                        help="shade every bar from its color through amber to red over the last 20%% of each cycle")
+    parser.add_argument('--countdown', action='store_true',
+                        help="show the seconds left and the cycle count on every bar")
+    parser.add_argument('--stats', action='store_true',
+                        help="collect hot-path timings from the start (SIGUSR1 dumps them as JSON)")
+    parser.add_argument('--tty', action='store_true',
+                        help="run in the terminal without Tk: an ANSI bar, or one 'tick N SECONDS' line "
+                             "per boundary when piped")
+    parser.add_argument('--cycles', type=int, metavar='N', help="with --tty, exit after N cycles")
+    parser.add_argument('--sound', action='store_true', help="with --tty, play the boundary sounds")
+    parser.add_argument('--sync', choices=PhaseSync.SYNC_ROLES,
+                        help="share the first bar's phase with other tickbar processes, or follow the one that does")
+    parser.add_argument('--sync-path', metavar='PATH', help=f"shared phase file (default: {default_sync_path()})")
+    parser.add_argument('--restore', nargs='?', const='default', metavar='NAME',
+                        help="save each bar's phase, duration, sound and position under NAME and restore them "
+                             "on the next start with the same NAME (default: %(const)s)")
+    parser.add_argument('--bars', type=int, default=1, help="number of independent bars to run in this process")
+    parser.add_argument('--durations', type=float, nargs='+', metavar='SECONDS',
+                        help="cycle duration of each bar (implies one bar per duration)")
+    args = parser.parse_args(argv)
+    if args.bars < 1:
+        parser.error("--bars must be at least 1")
+    args.audio_backend = None
+    if not (args.tty or args.send):
+        # The window bars take the range set_duration allows with the backend they will play through.
+        args.audio_backend = env_audio_backend()
+        min_duration, max_duration = duration_range(args.audio_backend)
+        for duration in args.durations or ():
+            if not min_duration <= duration <= max_duration:
+                parser.error(f"--durations must be between {min_duration:g} and {max_duration:g} seconds, "
+                             f"not {duration:g}")
+    return args
 
 if __name__ == "__main__":
     try:
+        args = parse_args()
+        if args.send:
+            send_command(args.send, args.control)
+            sys.exit(0)
+        if args.tty:
+            sys.exit(run_terminal(args))
+        load_tk()
+        STARTUP.mark('imports')
         root = tk.Tk()
-        app = HUDApp(root)
+        STARTUP.mark('tk init')
+        intro = args.intro or ('none' if args.fast_start else 'full')
+        durations = args.durations or []
+        durations += [6.0] * (args.bars - len(durations))
+        state_paths = [None] * len(durations)
+        if args.restore:
+            name = args.restore.replace(os.sep, '_')
+            state_paths = [cache_path(f'{name}.bar{index}.state') for index in range(len(durations))]
+        if len(durations) == 1:
+            app = HUDApp(root, audio_backend=args.audio_backend, fast_start=args.fast_start, intro=intro,
+                         timings=args.timings, duration=durations[0], renderer=args.renderer,
+                         animation=args.animation, state_path=state_paths[0])
+            host = app.host
+        else:
+            root.withdraw()
+            host = BarHost(root, audio_backend=args.audio_backend, fast_start=args.fast_start, timings=args.timings)
+            for duration, state_path in zip(durations, state_paths):
+                host.create_bar(intro=intro, duration=duration, renderer=args.renderer, animation=args.animation,
+                                state_path=state_path)
+        if args.program:
+            for bar in host.bars:
+                bar.load_program(args.program)
+        if args.sync:
+            for bar in host.bars[:1] if args.sync == 'publish' else host.bars:
+                bar.enable_sync(args.sync, args.sync_path)
+        if args.urgency:
+            for bar in host.bars:
+                bar.urgency_var.set(True)
+                bar.on_urgency_setting()
+        if args.countdown:
+            for bar in host.bars:
+                bar.countdown_var.set(True)
+                bar.on_countdown_setting()
+        if args.stats:
+            host.enable_stats()
+        if args.control:
+            host.start_control_server(args.control)
         root.mainloop()
     except Exception as e:
         print(f"Error starting app: {e}")